@@ -1,8 +1,11 @@
 """Admin endpoints — destructive operations for maintenance."""
 
+import asyncio
 import logging
-from fastapi import APIRouter
 
+from fastapi import APIRouter, HTTPException, Query
+
+from app.services import backlog
 from app.services import database as db
 
 logger = logging.getLogger(__name__)
@@ -15,3 +18,42 @@ async def delete_all_articles():
     count = await db.delete_all_articles()
     logger.info(f"[ADMIN] Deleted {count} articles")
     return {"deleted": count}
+
+
+_backlog_task: asyncio.Task | None = None
+
+
+@router.post("/backlog/score")
+async def start_backlog_scoring(
+    limit: int = Query(1000, ge=1, le=50000),
+    dry_run: bool = Query(False, description="Score without writing back (always on for local)"),
+):
+    """Score unscored pending articles as background batch jobs (resumes timed-out jobs)."""
+    global _backlog_task
+    if _backlog_task is not None and not _backlog_task.done():
+        raise HTTPException(status_code=409, detail="Backlog scoring already running")
+    _backlog_task = asyncio.create_task(backlog.score_backlog(limit, dry_run=dry_run))
+    logger.info(f"[ADMIN] Started backlog scoring (limit={limit}, dry_run={dry_run})")
+    return {"started": True, "limit": limit, "dry_run": dry_run}
+
+
+@router.post("/articles/filtered/requeue")
+async def requeue_filtered_articles(limit: int = Query(100, ge=1, le=10000)):
+    """Send prefilter-rejected articles (highest prefilter score first) back for scoring.
+
+    List them first with GET /api/articles?status=filtered to audit false negatives.
+    """
+    count = await db.requeue_filtered_articles(limit)
+    logger.info(f"[ADMIN] Requeued {count} filtered articles")
+    return {"requeued": count}
+
+
+@router.get("/backlog/score")
+async def backlog_scoring_status():
+    """Status of the current or most recent backlog scoring run."""
+    running = _backlog_task is not None and not _backlog_task.done()
+    error = None
+    if _backlog_task is not None and _backlog_task.done() and not _backlog_task.cancelled():
+        exc = _backlog_task.exception()
+        error = str(exc) if exc else None
+    return {"running": running, "error": error, **backlog.last_run}
@@ -7,10 +7,15 @@ from app.models import (
     ArticleInput,
     ArticleScore,
     ArticleStatus,
+    DeduplicationRequest,
+    DeduplicationResponse,
     TweetOutput,
 )
-from app.services.ai import score_article, generate_tweet
-from app.services.embeddings import generate_embedding
+from app.core.config import settings
+from app.services.ai import score_article, score_and_generate, generate_tweet
+from app.services.embeddings import check_duplicate, generate_embedding
+from app.services import prefilter
+from app.services.rss import get_seen_index
 from app.services import database as db
 
 router = APIRouter()
@@ -21,35 +26,68 @@ async def process_article(article: ArticleInput):
     """
     Process a new article from n8n RSS aggregation.
     1. Dedup by URL
-    2. Score with Gemini
-    3. Generate tweet if relevant
-    4. Save to Neon DB
+    2. Embed, dedup by similarity to recent articles, run the local relevance prefilter
+    3. Score with Gemini (skipped if the prefilter rejects it in enforce mode)
+    4. Generate tweet if relevant
+    5. Save to Neon DB
     """
     # 1. Check if URL already exists
-    existing = await db.get_article_by_url(article.url)
-    if existing:
+    existing_id = await db.get_article_id_by_url(article.url)
+    if existing_id:
         return {
             "status": "duplicate",
-            "message": f"Article already exists with ID {existing.id}",
-            "id": str(existing.id),
+            "message": f"Article already exists with ID {existing_id}",
+            "id": str(existing_id),
         }
 
-    # 2. Score the article with Gemini
+    # 2. Generate embedding for dedup, then the local prefilter verdict
+    embedding = None
+    try:
+        embedding = await generate_embedding(f"{article.title} {article.content[:500]}")
+    except Exception as e:
+        print(f"[WARN] Embedding failed: {e}")
+    is_dup, similar_id, similarity = await check_duplicate(
+        embedding, settings.DEDUP_SIMILARITY_THRESHOLD
+    )
+    if is_dup:
+        return {
+            "status": "duplicate",
+            "message": f"Near-duplicate of article {similar_id} (similarity {similarity})",
+            "id": similar_id,
+            "similarity_score": similarity,
+        }
+    verdict = None
+    try:
+        verdict = await prefilter.evaluate(article.title, article.content, embedding)
+    except Exception as e:
+        print(f"[WARN] Prefilter failed: {e}")
+    rejected = prefilter.should_reject(verdict)
+
+    # 3. Score the article with Gemini (combined mode also drafts the tweet)
     relevance = None
     newsworthiness = None
     summary = None
+    analysis = None
     try:
-        score_result = await score_article(article.title, article.content)
-        relevance = score_result.relevance
-        newsworthiness = score_result.newsworthiness
-        summary = score_result.summary
+        if not rejected:
+            if settings.COMBINED_SCORE_AND_TWEET:
+                score_result = analysis = await score_and_generate(article.title, article.content)
+            else:
+                score_result = await score_article(article.title, article.content)
+            relevance = score_result.relevance
+            newsworthiness = score_result.newsworthiness
+            summary = score_result.summary
+            prefilter.record_agreement(verdict, article.title, relevance)
     except Exception as e:
         print(f"[WARN] Scoring failed for '{article.title[:50]}': {e}")
 
-    # 3. Generate tweet if article is relevant (score >= 6)
+    # 4. Generate tweet if article is relevant (score >= TWEET_MIN_RELEVANCE)
     generated_tweet = None
     hashtags = []
-    if relevance and relevance >= 6:
+    if analysis is not None and analysis.tweet:
+        generated_tweet = analysis.tweet
+        hashtags = analysis.hashtags
+    elif relevance and relevance >= settings.TWEET_MIN_RELEVANCE:
         try:
             tweet_result = await generate_tweet(article.title, article.content)
             generated_tweet = tweet_result.tweet
@@ -57,13 +95,6 @@ async def process_article(article: ArticleInput):
         except Exception as e:
             print(f"[WARN] Tweet generation failed: {e}")
 
-    # 4. Generate embedding for dedup
-    embedding = None
-    try:
-        embedding = await generate_embedding(f"{article.title} {article.content[:500]}")
-    except Exception as e:
-        print(f"[WARN] Embedding failed: {e}")
-
     # 5. Save to database
     saved = await db.save_article(
         title=article.title,
@@ -77,7 +108,18 @@ async def process_article(article: ArticleInput):
         generated_tweet=generated_tweet,
         hashtags=hashtags,
         embedding=embedding,
+        status="filtered" if rejected else "pending",
+        prefilter_score=verdict.score if verdict else None,
     )
+    get_seen_index().add_article(article)
+    if saved is None:
+        # Saved by a concurrent request since the URL check above
+        existing_id = await db.get_article_id_by_url(article.url)
+        return {
+            "status": "duplicate",
+            "message": f"Article already exists with ID {existing_id}",
+            "id": str(existing_id),
+        }
 
     return {
         "status": "created",
@@ -88,9 +130,23 @@ async def process_article(article: ArticleInput):
         "newsworthiness_score": newsworthiness,
         "generated_tweet": generated_tweet,
         "hashtags": hashtags,
+        "prefilter_score": verdict.score if verdict else None,
+        "filtered": rejected,
     }
 
 
+@router.post("/deduplicate", response_model=DeduplicationResponse)
+async def check_article_duplicate(request: DeduplicationRequest):
+    """Check whether an article is a near-duplicate of a recent one (no DB writes)."""
+    embedding = await generate_embedding(f"{request.title} {request.content[:500]}")
+    is_dup, similar_id, similarity = await check_duplicate(
+        embedding, request.threshold, request.window_hours
+    )
+    return DeduplicationResponse(
+        is_duplicate=is_dup, similar_article_id=similar_id, similarity_score=similarity
+    )
+
+
 @router.get("/articles")
 async def list_articles(
     limit: int = Query(20, ge=1, le=100),
@@ -111,6 +167,7 @@ async def list_articles(
             "generated_tweet": a.generated_tweet,
             "hashtags": a.hashtags or [],
             "status": a.status or "pending",
+            "prefilter_score": a.prefilter_score,
             "created_at": str(a.created_at),
         }
         for a in articles
@@ -1,115 +1,332 @@
 """Fetch endpoint — triggers RSS ingestion pipeline on demand."""
 
+import asyncio
 import logging
-from fastapi import APIRouter
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Optional
 
-from app.services.rss import fetch_all_feeds
-from app.services.ai import score_article, generate_tweet
-from app.services.embeddings import generate_embedding
+from fastapi import APIRouter, Query
+
+from app.core.config import settings
+from app.models import ArticleInput, ArticleScore
+from app.services.rss import fetch_all_feeds, get_seen_index
+from app.services.scheduler import get_feed_scheduler
+from app.services.ai import score_article, score_articles, score_and_generate, generate_tweet
+from app.services.embeddings import check_duplicate, generate_embedding
+from app.services import prefilter
+from app.services.prefilter import PrefilterResult
+from app.services.urls import canonicalize_url
+from app.services.vector_index import VectorIndex
 from app.services import database as db
 
+if TYPE_CHECKING:
+    import numpy as np
+
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-@router.post("/fetch")
-async def trigger_fetch():
-    """
-    Fetch articles from all RSS feeds, process through AI pipeline, and save.
+class StageTimer:
+    """Accumulates wall-clock seconds spent in each pipeline stage."""
 
-    This reuses the same logic as POST /api/articles but fetches directly
-    from RSS feeds instead of waiting for n8n to push.
+    def __init__(self):
+        self.totals: dict[str, float] = defaultdict(float)
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.totals[name] += time.perf_counter() - start
+
+    def as_dict(self) -> dict[str, float]:
+        return {name: round(seconds, 3) for name, seconds in self.totals.items()}
+
+
+async def _embed(article: ArticleInput, timer: StageTimer) -> Optional["np.ndarray"]:
+    """Dedup embedding for an article (also the prefilter's input); None on failure."""
+    try:
+        with timer.stage("embedding"):
+            return await generate_embedding(f"{article.title} {article.content[:500]}")
+    except Exception as e:
+        logger.warning(f"[FETCH] Embedding failed: {e}")
+        return None
+
+
+async def _process_article(
+    article: ArticleInput,
+    timer: StageTimer,
+    embedding: Optional["np.ndarray"] = None,
+    verdict: PrefilterResult | None = None,
+    rejected: bool = False,
+    prescored: bool = False,
+    score_result: ArticleScore | None = None,
+) -> dict | None:
+    """Run one new article through scoring, tweet and save.
+
+    The embedding and prefilter verdict are computed beforehand. Articles the
+    prefilter rejected are saved as "filtered" without any Gemini call.
+    With prescored=True, score_result comes from batch scoring (None if that
+    failed) and no scoring call is made here. Otherwise, in combined mode the
+    score and tweet come from one score_and_generate call.
+    Returns the summary dict for the saved article, or None if the same
+    canonical URL was saved concurrently.
     """
-    # 1. Fetch all RSS feeds
-    raw_articles = await fetch_all_feeds()
-    logger.info(f"[FETCH] Got {len(raw_articles)} raw articles from RSS feeds")
+    # Score with Gemini
+    relevance = None
+    newsworthiness = None
+    summary = None
+    analysis = None
+    try:
+        if not prescored and not rejected:
+            with timer.stage("score"):
+                if settings.COMBINED_SCORE_AND_TWEET:
+                    score_result = analysis = await score_and_generate(
+                        article.title, article.content
+                    )
+                else:
+                    score_result = await score_article(article.title, article.content)
+        if score_result is not None:
+            relevance = score_result.relevance
+            newsworthiness = score_result.newsworthiness
+            summary = score_result.summary
+            logger.info(
+                f"[FETCH] Scored '{article.title[:60]}': "
+                f"relevance={relevance}, newsworthiness={newsworthiness}"
+            )
+            prefilter.record_agreement(verdict, article.title, relevance)
+    except Exception as e:
+        logger.warning(f"[FETCH] Scoring failed for '{article.title[:50]}': {e}")
+
+    # Generate tweet if relevant (score >= TWEET_MIN_RELEVANCE)
+    generated_tweet = None
+    hashtags = []
+    if analysis is not None and analysis.tweet:
+        generated_tweet = analysis.tweet
+        hashtags = analysis.hashtags
+        logger.info(f"[FETCH] Tweet: {generated_tweet}")
+    elif relevance and relevance >= settings.TWEET_MIN_RELEVANCE:
+        try:
+            with timer.stage("tweet"):
+                tweet_result = await generate_tweet(article.title, article.content)
+            generated_tweet = tweet_result.tweet
+            hashtags = tweet_result.hashtags
+            logger.info(f"[FETCH] Tweet: {generated_tweet}")
+        except Exception as e:
+            logger.warning(f"[FETCH] Tweet gen failed: {e}")
+
+    # Save to DB
+    with timer.stage("save"):
+        saved = await db.save_article(
+            title=article.title,
+            url=article.url,
+            content=article.content[:10000],
+            source=article.source,
+            published_at=article.published_at,
+            relevance_score=relevance,
+            newsworthiness_score=newsworthiness,
+            summary=summary,
+            generated_tweet=generated_tweet,
+            hashtags=hashtags,
+            embedding=embedding,
+            status="filtered" if rejected else "pending",
+            prefilter_score=verdict.score if verdict else None,
+        )
+    if saved is None:
+        logger.info(f"[FETCH] '{article.title[:60]}' was saved concurrently, skipping")
+        return None
+
+    return {
+        "id": str(saved.id),
+        "title": saved.title,
+        "source": saved.source,
+        "relevance": relevance,
+        "newsworthiness": newsworthiness,
+        "tweet": generated_tweet,
+        "hashtags": hashtags,
+        "prefilter": verdict.score if verdict else None,
+        "filtered": rejected,
+    }
+
+
+async def ingest_articles(
+    raw_articles: list[ArticleInput],
+    concurrent: bool = True,
+    timer: StageTimer | None = None,
+) -> dict:
+    """Dedup, embed, prefilter, score, generate tweets for and save a batch of fetched articles.
 
+    Near-duplicates (same story from another source, by embedding similarity
+    to recent articles or earlier ones in this batch) are dropped before any
+    Gemini call.
+
+    Shared by POST /api/fetch and the background feed scheduler.
+    """
+    timer = timer or StageTimer()
     results = {
         "fetched": len(raw_articles),
         "new": 0,
         "duplicates": 0,
+        "near_duplicates": 0,
+        "filtered": 0,
         "errors": 0,
+        "mode": "concurrent" if concurrent else "sequential",
         "articles": [],
     }
 
-    # 2. Process each article through the pipeline
+    # Drop known URLs (and canonical repeats within this batch) before any AI work
+    with timer.stage("dedup"):
+        known = await db.get_existing_urls([a.url for a in raw_articles])
+    seen = get_seen_index()
+    batch_canonical = set()
+    new_articles = []
     for article in raw_articles:
-        try:
-            # Dedup check
-            existing = await db.get_article_by_url(article.url)
-            if existing:
-                results["duplicates"] += 1
-                continue
+        canonical = canonicalize_url(article.url)
+        if article.url in known or canonical in batch_canonical:
+            results["duplicates"] += 1
+            seen.add_article(article)
+            continue
+        batch_canonical.add(canonical)
+        new_articles.append(article)
 
-            # Score with Gemini
-            relevance = None
-            newsworthiness = None
-            summary = None
-            try:
-                score_result = await score_article(article.title, article.content)
-                relevance = score_result.relevance
-                newsworthiness = score_result.newsworthiness
-                summary = score_result.summary
+    # Embed first: the vectors are stored for dedup and feed the local prefilter
+    embeddings = await asyncio.gather(*(_embed(a, timer) for a in new_articles))
+
+    # Drop stories already covered by a recent article or an earlier one in this batch
+    with timer.stage("dedup"):
+        batch_index = VectorIndex()
+        kept = []
+        for article, embedding in zip(new_articles, embeddings):
+            threshold = settings.DEDUP_SIMILARITY_THRESHOLD
+            is_dup, similar_id, score = await check_duplicate(embedding, threshold)
+            if not is_dup:
+                is_dup, similar_id, score = await check_duplicate(
+                    embedding, threshold, index=batch_index
+                )
+            if is_dup:
                 logger.info(
-                    f"[FETCH] Scored '{article.title[:60]}': "
-                    f"relevance={relevance}, newsworthiness={newsworthiness}"
+                    f"[FETCH] Near-duplicate '{article.title[:60]}' "
+                    f"(similarity {score} to {similar_id})"
                 )
-            except Exception as e:
-                logger.warning(f"[FETCH] Scoring failed for '{article.title[:50]}': {e}")
-
-            # Generate tweet if relevant (score >= 6)
-            generated_tweet = None
-            hashtags = []
-            if relevance and relevance >= 6:
-                try:
-                    tweet_result = await generate_tweet(article.title, article.content)
-                    generated_tweet = tweet_result.tweet
-                    hashtags = tweet_result.hashtags
-                    logger.info(f"[FETCH] Tweet: {generated_tweet}")
-                except Exception as e:
-                    logger.warning(f"[FETCH] Tweet gen failed: {e}")
-
-            # Generate embedding
-            embedding = None
+                results["near_duplicates"] += 1
+                seen.add_article(article)
+                continue
+            if embedding is not None:
+                batch_index.add(article.url, embedding)
+            kept.append((article, embedding))
+        new_articles = [a for a, _ in kept]
+        embeddings = [e for _, e in kept]
+
+    async def judge(
+        article: ArticleInput, embedding: Optional["np.ndarray"]
+    ) -> PrefilterResult | None:
+        try:
+            return await prefilter.evaluate(article.title, article.content, embedding)
+        except Exception as e:
+            logger.warning(f"[FETCH] Prefilter failed for '{article.title[:50]}': {e}")
+            return None
+
+    with timer.stage("prefilter"):
+        verdicts = list(
+            await asyncio.gather(*(judge(a, e) for a, e in zip(new_articles, embeddings)))
+        )
+    rejected = {i for i, v in enumerate(verdicts) if prefilter.should_reject(v)}
+    results["filtered"] = len(rejected)
+
+    # Score in batches (one Gemini request per SCORING_BATCH_SIZE articles)
+    # (combined mode scores per article instead, together with the tweet)
+    to_score = {
+        str(i): (a.title, a.content) for i, a in enumerate(new_articles) if i not in rejected
+    }
+    prescored = (
+        not settings.COMBINED_SCORE_AND_TWEET
+        and settings.SCORING_BATCH_SIZE > 1
+        and len(to_score) > 1
+    )
+    scores: dict[str, ArticleScore] = {}
+    if prescored:
+        with timer.stage("score"):
+            scores = await score_articles(to_score)
+
+    # Process each new article through the pipeline
+    semaphore = asyncio.Semaphore(max(1, settings.FETCH_CONCURRENCY if concurrent else 1))
+
+    async def run(index: int, article: ArticleInput):
+        async with semaphore:
             try:
-                embedding = await generate_embedding(
-                    f"{article.title} {article.content[:500]}"
+                return await _process_article(
+                    article,
+                    timer,
+                    embedding=embeddings[index],
+                    verdict=verdicts[index],
+                    rejected=index in rejected,
+                    prescored=prescored,
+                    score_result=scores.get(str(index)),
                 )
             except Exception as e:
-                logger.warning(f"[FETCH] Embedding failed: {e}")
-
-            # Save to DB
-            saved = await db.save_article(
-                title=article.title,
-                url=article.url,
-                content=article.content[:10000],
-                source=article.source,
-                published_at=article.published_at,
-                relevance_score=relevance,
-                newsworthiness_score=newsworthiness,
-                summary=summary,
-                generated_tweet=generated_tweet,
-                hashtags=hashtags,
-                embedding=embedding,
-            )
+                logger.error(f"[FETCH] Error processing '{article.title[:50]}': {e}")
+                return e
 
-            results["new"] += 1
-            results["articles"].append({
-                "id": str(saved.id),
-                "title": saved.title,
-                "source": saved.source,
-                "relevance": relevance,
-                "newsworthiness": newsworthiness,
-                "tweet": generated_tweet,
-                "hashtags": hashtags,
-            })
+    outcomes = await asyncio.gather(*(run(i, a) for i, a in enumerate(new_articles)))
 
-        except Exception as e:
-            logger.error(f"[FETCH] Error processing '{article.title[:50]}': {e}")
+    for article, outcome in zip(new_articles, outcomes):
+        if isinstance(outcome, Exception):
             results["errors"] += 1
+        elif outcome is None:
+            results["duplicates"] += 1
+            seen.add_article(article)
+        else:
+            results["new"] += 1
+            results["articles"].append(outcome)
+            seen.add_article(article)
 
     logger.info(
         f"[FETCH] Done: {results['new']} new, "
-        f"{results['duplicates']} duplicates, {results['errors']} errors"
+        f"{results['duplicates']} duplicates, {results['near_duplicates']} near-duplicates, "
+        f"{results['filtered']} filtered, "
+        f"{results['errors']} errors ({results['mode']})"
     )
     return results
+
+
+@router.post("/fetch")
+async def trigger_fetch(
+    concurrent: bool = Query(True, description="Process articles in parallel"),
+):
+    """
+    Fetch articles from all RSS feeds, process through AI pipeline, and save.
+
+    This reuses the same logic as POST /api/articles but fetches directly
+    from RSS feeds instead of waiting for n8n to push.
+
+    With concurrent=true (default), up to FETCH_CONCURRENCY articles are in
+    flight at once; Gemini calls are further capped by MAX_CONCURRENT_AI_CALLS.
+    Per-stage timings are cumulative across articles, so in concurrent mode
+    their sum exceeds the wall-clock total.
+    """
+    timer = StageTimer()
+    started = time.perf_counter()
+
+    # 1. Fetch all RSS feeds
+    with timer.stage("rss"):
+        raw_articles = await fetch_all_feeds()
+    logger.info(f"[FETCH] Got {len(raw_articles)} raw articles from RSS feeds")
+
+    # 2. Dedup, score, generate and save
+    results = await ingest_articles(raw_articles, concurrent=concurrent, timer=timer)
+
+    results["timings"] = {
+        **timer.as_dict(),
+        "total": round(time.perf_counter() - started, 3),
+    }
+    return results
+
+
+@router.get("/fetch/schedule")
+async def fetch_schedule():
+    """Per-feed polling state learned by the adaptive feed scheduler."""
+    scheduler = get_feed_scheduler()
+    return {"running": scheduler.running, "feeds": scheduler.snapshot()}
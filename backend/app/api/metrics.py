@@ -0,0 +1,27 @@
+"""Metrics endpoint — runtime counters for the AI pipeline."""
+
+from fastapi import APIRouter
+
+from app.services import prefilter
+from app.services.ai import get_limiter, get_prefix_cache, token_stats
+from app.services.ai_cache import get_response_cache
+from app.services.ai_latency import latency_stats
+from app.services.embeddings import get_embedding_batcher
+from app.services.vector_index import get_vector_index
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """Cache, rate limiter, latency, token, prefilter, embedding and vector index counters."""
+    return {
+        "ai_cache": await get_response_cache().stats(),
+        "ai_limiter": get_limiter().stats(),
+        "ai_latency": latency_stats(),
+        "ai_tokens": token_stats(),
+        "prompt_cache": get_prefix_cache().stats(),
+        "prefilter": prefilter.stats(),
+        "embeddings": get_embedding_batcher().stats(),
+        "vector_index": get_vector_index().stats(),
+    }
@@ -1,24 +1,84 @@
 """Tweet generation API endpoints."""
 
-from fastapi import APIRouter
+import json
+import logging
 
-from app.models import TweetOutput
-from app.services.ai import generate_tweet
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
 
+from app.models import TweetCandidates, TweetOutput
+from app.services.ai import generate_tweet, stream_tweet
+from app.services.ai_limiter import Priority
+
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
 @router.post("/generate-tweet", response_model=TweetOutput)
 async def generate_tweet_endpoint(article_id: str, title: str, content: str):
     """
     Generate a tweet for an article using Gemini AI.
     """
-    return await generate_tweet(title, content)
+    return await generate_tweet(title, content, priority=Priority.INTERACTIVE)
 
 
-@router.post("/regenerate-tweet", response_model=TweetOutput)
-async def regenerate_tweet(article_id: str, title: str, content: str, feedback: str | None = None):
+@router.post("/regenerate-tweet", response_model=TweetCandidates)
+async def regenerate_tweet(
+    article_id: str,
+    title: str,
+    content: str,
+    feedback: str | None = None,
+    variants: int = Query(1, ge=1, le=5, description="Candidates to generate in one call"),
+):
     """
     Regenerate a tweet with optional feedback for improvement.
+    Always asks Gemini for a fresh tweet instead of reusing a cached one.
+
+    With variants > 1, the top-level fields hold the best-scoring candidate
+    and `alternatives` the rest (best first), all from a single Gemini call.
     """
-    return await generate_tweet(title, content, feedback=feedback)
+    result = await generate_tweet(
+        title,
+        content,
+        feedback=feedback,
+        use_cache=False,
+        priority=Priority.INTERACTIVE,
+        variants=variants,
+    )
+    if isinstance(result, TweetCandidates):
+        return result
+    return TweetCandidates(**result.model_dump())
+
+
+@router.post("/regenerate-tweet/stream")
+async def regenerate_tweet_stream(
+    article_id: str, title: str, content: str, feedback: str | None = None
+):
+    """
+    Streaming variant of /regenerate-tweet as Server-Sent Events.
+
+    Emits `delta` events ({"text": ...}) with tweet text as Gemini writes it,
+    then one `done` event carrying the validated TweetOutput, or an `error`
+    event if generation or validation fails.
+    """
+
+    async def events():
+        try:
+            async for item in stream_tweet(title, content, feedback=feedback):
+                if isinstance(item, TweetOutput):
+                    yield _sse("done", item.model_dump())
+                else:
+                    yield _sse("delta", {"text": item})
+        except Exception as e:
+            logger.warning(f"[TWEETS] Streaming regeneration failed for {article_id}: {e}")
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
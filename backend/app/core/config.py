@@ -26,9 +26,86 @@ class Settings(BaseSettings):
 
     # Gemini
     GEMINI_MODEL: str = "gemini-3-flash-preview"
+    GEMINI_BASE_URL: str = ""  # e.g. http://127.0.0.1:8090 for benchmarks/fake_gemini.py
+    SCORING_BATCH_SIZE: int = 10  # articles per scoring request; 1 disables batching
+    TWEET_MIN_RELEVANCE: int = 6  # generate tweets only at or above this relevance
+    COMBINED_SCORE_AND_TWEET: bool = False  # score and draft the tweet in one call
+
+    # Article content budget per prompt (HTML and boilerplate are stripped first)
+    PROMPT_SCORE_CONTENT_TOKENS: int = 400
+    PROMPT_BATCH_CONTENT_TOKENS: int = 300  # per article in a batch request
+    PROMPT_TWEET_CONTENT_TOKENS: int = 600
+
+    # Static prompt instructions as a Gemini cached-context prefix
+    PROMPT_CACHE_ENABLED: bool = True
+    PROMPT_CACHE_TTL_MINUTES: float = 60.0  # refreshed when less than 20% is left
+    PROMPT_CACHE_RETRY_MINUTES: float = 60.0  # wait after a failed create before retrying
+    PROMPT_CACHE_MIN_TOKENS: int = 1024  # Gemini's minimum cacheable size; shorter goes inline
+
+    # Local relevance prefilter before Gemini scoring ("off", "shadow" or "enforce")
+    PREFILTER_MODE: str = "shadow"
+    PREFILTER_THRESHOLD: float = 0.3  # blended topic-similarity/keyword score
+
+    # Backlog scoring through the Batch API ("gemini", or "local" stand-in for offline runs)
+    BATCH_SCORING_BACKEND: str = "gemini"
+    BATCH_POLL_SECONDS: float = 30.0
+    BATCH_TIMEOUT_HOURS: float = 24.0
+    BATCH_JOB_MAX_REQUESTS: int = 2000  # inlined requests per job (keeps each job under ~20 MB)
+    BATCH_JOBS_PATH: str = ".backlog_jobs.json"  # submitted jobs, resumed after a timeout
+
+    # Gemini response cache (SQLite file, keyed by model + template + prompt hash)
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_PATH: str = ".ai_cache.sqlite3"
+    AI_CACHE_TTL_HOURS: float = 168.0
+    AI_CACHE_MAX_ENTRIES: int = 20000
+
+    # RSS
+    RSS_CACHE_PATH: str = ".rss_cache.json"  # ETag/Last-Modified/body hash per feed
+    RSS_PARSE_EXECUTOR: str = "thread"  # "thread" or "process"
+    RSS_PARSE_WORKERS: int = 2
+    SEEN_INDEX_WARM_LIMIT: int = 100000  # stored articles loaded into the seen-entry index
+
+    # Adaptive feed scheduler (polls feeds in-process instead of n8n / manual fetch)
+    FEED_SCHEDULER_ENABLED: bool = False
+    FEED_POLL_MIN_MINUTES: float = 5.0
+    FEED_POLL_MAX_MINUTES: float = 360.0
+    FEED_POLL_JITTER: float = 0.1  # +/- fraction applied to each interval
+
+    # Embeddings (concurrent requests are micro-batched into one encode call)
+    EMBED_BACKEND: str = "torch"  # "torch" (sentence-transformers) or "onnx" (int8, no torch)
+    EMBED_ONNX_REPO: str = "sentence-transformers/all-MiniLM-L6-v2"
+    EMBED_ONNX_FILE: str = "onnx/model_quint8_avx2.onnx"  # "onnx/model_qint8_arm64.onnx" on ARM
+    EMBED_ONNX_DIR: str = ""  # local copy of the repo files; skips the download
+    EMBED_ONNX_THREADS: int = 0  # 0 = onnxruntime default
+    EMBED_BATCH_MAX_SIZE: int = 32
+    EMBED_BATCH_WINDOW_MS: float = 10.0
+    EMBEDDING_STORAGE_DTYPE: str = "float32"  # or "float16" (half the bytes, ~1e-3 error)
+
+    # Semantic dedup against recent articles
+    DEDUP_BACKEND: str = "memory"  # "memory" (in-process index) or "pgvector" (HNSW in Postgres)
+    DEDUP_SIMILARITY_THRESHOLD: float = 0.85  # cosine similarity
+    DEDUP_WINDOW_HOURS: float = 72.0
+    VECTOR_INDEX_MAX_ITEMS: int = 100000
+    PGVECTOR_EF_SEARCH: int = 40  # HNSW candidate list size (higher = better recall, slower)
+    PGVECTOR_ITERATIVE_SCAN: str = "relaxed_order"  # pgvector >= 0.8; "off" for older versions
 
     # Rate Limiting
-    MAX_CONCURRENT_AI_CALLS: int = 5
+    MAX_CONCURRENT_AI_CALLS: int = 5  # upper bound; AIMD halves it on 429s
+    GEMINI_RPM: int = 1000  # requests per minute (0 disables the bucket)
+    GEMINI_TPM: int = 1000000  # tokens per minute (0 disables the bucket)
+    AI_MAX_RETRIES: int = 4
+    AI_RETRY_BASE_SECONDS: float = 1.0
+    AI_RETRY_MAX_SECONDS: float = 60.0
+    FETCH_CONCURRENCY: int = 10  # articles in flight during POST /api/fetch
+
+    # Gemini deadlines and hedging (a second request after the p95 latency)
+    AI_TIMEOUT_SECONDS: float = 30.0  # per attempt, bulk calls
+    AI_INTERACTIVE_TIMEOUT_SECONDS: float = 15.0  # per attempt, moderator-facing calls
+    AI_HEDGE_ENABLED: bool = False
+    AI_HEDGE_QUANTILE: float = 0.95
+    AI_HEDGE_MIN_SECONDS: float = 1.0
+    AI_STREAM_CHUNK_TIMEOUT_SECONDS: float = 15.0  # max gap between streamed chunks
+    AI_STREAM_TIMEOUT_SECONDS: float = 60.0  # whole streamed response
 
     # Twitter/X OAuth 1.0a
     TWITTER_BEARER_TOKEN: str = ""
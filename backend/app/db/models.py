@@ -3,9 +3,12 @@
 from datetime import datetime
 from enum import Enum
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from uuid import UUID
 
+if TYPE_CHECKING:
+    import numpy as np
+
 
 class ArticleStatus(str, Enum):
     """Article processing status."""
@@ -14,6 +17,7 @@ class ArticleStatus(str, Enum):
     REJECTED = "rejected"
     DEFERRED = "deferred"
     PUBLISHED = "published"
+    FILTERED = "filtered"  # rejected by the local prefilter, never seen by Gemini
 
 
 @dataclass
@@ -24,6 +28,7 @@ class Article:
     url: str
     content: str
     source: str
+    canonical_url: Optional[str] = None
     published_at: Optional[datetime] = None
     created_at: Optional[datetime] = None
     relevance_score: Optional[int] = None
@@ -31,8 +36,9 @@ class Article:
     summary: Optional[str] = None
     generated_tweet: Optional[str] = None
     hashtags: list[str] = field(default_factory=list)
-    embedding: Optional[list[float]] = None
+    embedding: Optional["np.ndarray"] = None  # float32; stored as packed bytes
     status: str = "pending"
+    prefilter_score: Optional[float] = None
     moderated_at: Optional[datetime] = None
     edited_tweet: Optional[str] = None
 
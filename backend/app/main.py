@@ -1,21 +1,37 @@
 """FastAPI application entry point."""
 
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 
-from app.api import articles, health, tweets, publish, fetch, admin
+from app.api import articles, health, tweets, publish, fetch, admin, metrics
 from app.core.config import settings
+from app.services.embeddings import shutdown_embed_executor, warm_vector_index
+from app.services.rss import shutdown_parse_executor, warm_seen_index
+from app.services.scheduler import get_feed_scheduler
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown events."""
-    # Embedding model loads lazily on first use (torch is slow to import)
+    # Embedding model loads lazily on first use (torch is slow to import;
+    # EMBED_BACKEND=onnx avoids it)
+    # Warm the seen-entry index in the background; DB dedup covers the gap
+    warm_task = asyncio.create_task(warm_seen_index())
+    # Same for the vector index used by semantic dedup
+    vector_warm_task = asyncio.create_task(warm_vector_index())
+    if settings.FEED_SCHEDULER_ENABLED:
+        get_feed_scheduler().start(fetch.ingest_articles)
     yield
-    # Shutdown: cleanup if needed
+    # Shutdown: stop polling and release feed parser / embedding workers
+    warm_task.cancel()
+    vector_warm_task.cancel()
+    await get_feed_scheduler().stop()
+    shutdown_parse_executor()
+    shutdown_embed_executor()
 
 
 app = FastAPI(
@@ -42,3 +58,4 @@ app.include_router(tweets.router, prefix="/api", tags=["Tweets"])
 app.include_router(publish.router, prefix="/api", tags=["Publishing"])
 app.include_router(fetch.router, prefix="/api", tags=["Fetch"])
 app.include_router(admin.router, prefix="/api", tags=["Admin"])
+app.include_router(metrics.router, prefix="/api", tags=["Metrics"])
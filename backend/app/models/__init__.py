@@ -2,22 +2,28 @@
 
 from app.models.schemas import (
     Article,
+    ArticleAnalysis,
     ArticleApproval,
+    ArticleBatchScore,
     ArticleInput,
     ArticleScore,
     ArticleStatus,
     DeduplicationRequest,
     DeduplicationResponse,
+    TweetCandidates,
     TweetOutput,
 )
 
 __all__ = [
     "Article",
+    "ArticleAnalysis",
     "ArticleApproval",
+    "ArticleBatchScore",
     "ArticleInput",
     "ArticleScore",
     "ArticleStatus",
     "DeduplicationRequest",
     "DeduplicationResponse",
+    "TweetCandidates",
     "TweetOutput",
 ]
@@ -3,7 +3,7 @@
 from datetime import datetime
 from enum import Enum
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 class ArticleStatus(str, Enum):
@@ -13,6 +13,7 @@ class ArticleStatus(str, Enum):
     APPROVED = "approved"
     REJECTED = "rejected"
     DEFERRED = "deferred"
+    FILTERED = "filtered"
 
 
 class ArticleInput(BaseModel):
@@ -23,6 +24,7 @@ class ArticleInput(BaseModel):
     content: str
     source: str
     published_at: datetime | None = None
+    guid: str | None = None
 
 
 class ArticleScore(BaseModel):
@@ -33,6 +35,21 @@ class ArticleScore(BaseModel):
     summary: str = Field(max_length=280, description="Brief summary")
 
 
+class ArticleBatchScore(ArticleScore):
+    """Score for one article in a batch scoring response."""
+
+    id: str = Field(description="Article id exactly as given in the prompt")
+
+
+class ArticleAnalysis(ArticleScore):
+    """Scores plus a tweet draft from a single combined Gemini call."""
+
+    tweet: str | None = Field(
+        default=None, max_length=260, description="Tweet text, only if relevant enough"
+    )
+    hashtags: list[str] = Field(default=[], max_length=2, description="1-2 hashtags max")
+
+
 class TweetOutput(BaseModel):
     """Generated tweet with validation."""
 
@@ -41,6 +58,12 @@ class TweetOutput(BaseModel):
     score: int = Field(ge=1, le=10, description="Confidence score")
 
 
+class TweetCandidates(TweetOutput):
+    """Best-scoring tweet candidate, with the remaining candidates ranked by score."""
+
+    alternatives: list[TweetOutput] = Field(default=[], description="Other candidates, best first")
+
+
 class Article(BaseModel):
     """Full article model with AI processing results."""
 
@@ -62,6 +85,12 @@ class Article(BaseModel):
     # Status
     status: ArticleStatus = ArticleStatus.PENDING
 
+    @field_validator("embedding", mode="before")
+    @classmethod
+    def _embedding_to_list(cls, value):
+        # Stored articles carry the embedding as a float32 numpy array
+        return value.tolist() if hasattr(value, "tolist") else value
+
     class Config:
         from_attributes = True
 
@@ -80,6 +109,7 @@ class DeduplicationRequest(BaseModel):
     title: str
     content: str
     threshold: float = Field(default=0.85, ge=0.0, le=1.0)
+    window_hours: float | None = Field(default=None, gt=0)  # default: DEDUP_WINDOW_HOURS
 
 
 class DeduplicationResponse(BaseModel):
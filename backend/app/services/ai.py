@@ -3,38 +3,297 @@
 Uses the latest google-genai SDK (2026) with native Pydantic structured output.
 Uses client.aio for async operations (required in FastAPI async context).
 All heavy imports (google.genai) are lazy to avoid blocking server startup.
+
+Each prompt is split into static instructions (sent as a cached-context
+prefix or system instruction, see ai_prefix) and the per-article part.
 """
 
+import asyncio
+import json
+import logging
+import re
+from typing import AsyncIterator
+
 from app.core.config import settings
-from app.models import ArticleScore, TweetOutput
+from app.models import (
+    ArticleAnalysis,
+    ArticleBatchScore,
+    ArticleScore,
+    TweetCandidates,
+    TweetOutput,
+)
+from app.services.ai_cache import get_response_cache
+from app.services.ai_latency import get_histogram, run_hedged
+from app.services.ai_limiter import AdaptiveLimiter, Priority, error_code
+from app.services.ai_prefix import PrefixCache
+from app.services.prompt_builder import build_content
+
+logger = logging.getLogger(__name__)
 
 # Lazy client initialization
 _client = None
 
+# Shared rate limiter / retry policy for every Gemini request
+_limiter: AdaptiveLimiter | None = None
+
+# Cached-context prefixes for the static instructions
+_prefix_cache: PrefixCache | None = None
+
+# Expected response size, used to reserve TPM budget before a call
+OUTPUT_TOKEN_ESTIMATE = 512
+
+# Token usage reported by Gemini, per call kind
+_token_usage: dict[str, dict[str, int]] = {}
+
 
 def get_client():
-    """Get or create Gemini client (lazy initialization)."""
+    """Get or create Gemini client (lazy initialization).
+
+    GEMINI_BASE_URL redirects it, e.g. to the local fake server for benchmarks.
+    """
     global _client
     if _client is None:
         from google import genai
-        _client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        if settings.GEMINI_BASE_URL:
+            from google.genai import types
+            _client = genai.Client(
+                api_key=settings.GEMINI_API_KEY or "fake-key",
+                http_options=types.HttpOptions(base_url=settings.GEMINI_BASE_URL),
+            )
+        else:
+            _client = genai.Client(api_key=settings.GEMINI_API_KEY)
     return _client
 
 
-SCORING_PROMPT = """You are a tech news curator evaluating articles for a Twitter account focused on AI, ML, and tech news.
+def get_limiter() -> AdaptiveLimiter:
+    """Get or create the limiter shared by all Gemini calls."""
+    global _limiter
+    if _limiter is None:
+        _limiter = AdaptiveLimiter(
+            max_concurrency=settings.MAX_CONCURRENT_AI_CALLS,
+            requests_per_minute=settings.GEMINI_RPM,
+            tokens_per_minute=settings.GEMINI_TPM,
+            max_retries=settings.AI_MAX_RETRIES,
+            base_delay=settings.AI_RETRY_BASE_SECONDS,
+            max_delay=settings.AI_RETRY_MAX_SECONDS,
+        )
+    return _limiter
+
+
+def get_prefix_cache() -> PrefixCache:
+    """Get or create the instruction-prefix cache."""
+    global _prefix_cache
+    if _prefix_cache is None:
+        _prefix_cache = PrefixCache(
+            get_client,
+            ttl_seconds=settings.PROMPT_CACHE_TTL_MINUTES * 60,
+            retry_seconds=settings.PROMPT_CACHE_RETRY_MINUTES * 60,
+            min_tokens=settings.PROMPT_CACHE_MIN_TOKENS,
+        )
+    return _prefix_cache
+
+
+def _record_usage(kind: str, usage, items: int) -> None:
+    stats = _token_usage.setdefault(
+        kind,
+        {"calls": 0, "articles": 0, "input_tokens": 0, "cached_tokens": 0, "output_tokens": 0},
+    )
+    stats["calls"] += 1
+    stats["articles"] += items
+    stats["input_tokens"] += usage.prompt_token_count or 0
+    stats["cached_tokens"] += getattr(usage, "cached_content_token_count", None) or 0
+    stats["output_tokens"] += usage.candidates_token_count or 0
+
+
+def token_stats() -> dict:
+    """Gemini token usage per call kind, with per-article averages."""
+    return {
+        kind: {
+            **stats,
+            "input_per_article": round(stats["input_tokens"] / stats["articles"], 1),
+            "output_per_article": round(stats["output_tokens"] / stats["articles"], 1),
+        }
+        for kind, stats in _token_usage.items()
+        if stats["articles"]
+    }
+
+
+async def _prefix_for(instructions: str | None) -> str | None:
+    """Cached-content name for these instructions, or None to send them inline."""
+    if not instructions or not settings.PROMPT_CACHE_ENABLED:
+        return None
+    return await get_prefix_cache().get(settings.GEMINI_MODEL, instructions)
+
+
+def _deadline(kind: str, priority: Priority) -> tuple[float, float | None]:
+    """Per-attempt timeout and hedge delay (None = no hedging) for a call."""
+    timeout = (
+        settings.AI_INTERACTIVE_TIMEOUT_SECONDS
+        if priority == Priority.INTERACTIVE
+        else settings.AI_TIMEOUT_SECONDS
+    )
+    hedge_after = None
+    if settings.AI_HEDGE_ENABLED:
+        quantile = get_histogram(kind).quantile(settings.AI_HEDGE_QUANTILE)
+        if quantile is not None:
+            hedge_after = max(quantile, settings.AI_HEDGE_MIN_SECONDS)
+    return timeout, hedge_after
+
+
+def _request_config(schema, instructions: str | None, cached_content: str | None):
+    from google.genai import types
+
+    return types.GenerateContentConfig(
+        response_mime_type="application/json",
+        response_schema=schema,
+        system_instruction=None if cached_content else instructions,
+        cached_content=cached_content,
+    )
+
+
+async def _generate(
+    prompt: str,
+    schema,
+    priority: Priority = Priority.BULK,
+    kind: str = "generic",
+    items: int = 1,
+    instructions: str | None = None,
+):
+    """Run a structured generate_content call through the shared rate limiter.
+
+    `instructions` go out as a cached-context prefix when one is available,
+    otherwise as a system instruction; a cached content the API rejects
+    (expired, deleted) is dropped and the call retried inline.
+    Each attempt runs under a deadline and may be hedged (see ai_latency);
+    timeouts are retried like 5xx errors.
+    Token counts from the response are recorded under `kind`; `items` is the
+    number of articles the call covered (more than one for batch scoring).
+    """
+    client = get_client()
+    limiter = get_limiter()
+    cached_content = await _prefix_for(instructions)
+    # Rough pre-call estimate (~4 chars per token); corrected from usage below
+    sent = prompt if cached_content else (instructions or "") + prompt
+    estimated_tokens = len(sent) // 4 + OUTPUT_TOKEN_ESTIMATE
+
+    async def call():
+        nonlocal cached_content
+        try:
+            return await client.aio.models.generate_content(
+                model=settings.GEMINI_MODEL,
+                contents=prompt,
+                config=_request_config(schema, instructions, cached_content),
+            )
+        except Exception as e:
+            if cached_content is None or error_code(e) not in (400, 403, 404):
+                raise
+            logger.info(f"[AI] Cached prefix {cached_content} rejected ({e}); sending inline")
+            get_prefix_cache().invalidate(cached_content)
+            cached_content = None
+            return await client.aio.models.generate_content(
+                model=settings.GEMINI_MODEL,
+                contents=prompt,
+                config=_request_config(schema, instructions, None),
+            )
+
+    histogram = get_histogram(kind)
+    timeout, hedge_after = _deadline(kind, priority)
+
+    async def take_hedge_slot() -> bool:
+        # The hedge is a real in-flight call: skip it when the limit leaves no room
+        if not limiter.try_acquire_slot():
+            return False
+        try:
+            await limiter.requests.acquire(1)
+        except BaseException:
+            limiter.release_slot()
+            raise
+        return True
+
+    async def attempt():
+        return await run_hedged(
+            call, histogram, timeout, hedge_after,
+            before_hedge=take_hedge_slot, after_hedge=limiter.release_slot,
+        )
 
-Evaluate the following article and provide:
+    response = await limiter.run(attempt, estimated_tokens=estimated_tokens, priority=priority)
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        _record_usage(kind, usage, items)
+        if usage.total_token_count:
+            limiter.tokens.adjust(estimated_tokens - usage.total_token_count)
+    return response.parsed
+
+
+async def _cached_generate(
+    kind: str,
+    instructions: str,
+    template: str,
+    prompt: str,
+    schema,
+    use_cache: bool = True,
+    priority: Priority = Priority.BULK,
+):
+    """_generate behind the persistent response cache.
+
+    Keyed by model, instructions + template text and the rendered prompt.
+    """
+    if not (use_cache and settings.AI_CACHE_ENABLED):
+        return await _generate(prompt, schema, priority, kind, instructions=instructions)
+
+    cache = get_response_cache()
+    key = cache.make_key(kind, settings.GEMINI_MODEL, instructions + template, prompt)
+    cached = await cache.get(key, schema)
+    if cached is not None:
+        return cached
+
+    parsed = await _generate(prompt, schema, priority, kind, instructions=instructions)
+    await cache.set(key, parsed, schema)
+    return parsed
+
+
+SCORING_INSTRUCTIONS = """\
+You are a tech news curator evaluating articles for a Twitter account focused on \
+AI, ML, and tech news.
+
+Evaluate the article and provide:
 1. Relevance score (1-10): How relevant is this to AI/ML/tech enthusiasts?
 2. Newsworthiness score (1-10): How timely and significant is this news?
 3. Brief summary (max 280 chars): Key takeaway in one sentence.
+"""
 
-Title: {title}
+BATCH_SCORING_INSTRUCTIONS = """\
+You are a tech news curator evaluating articles for a Twitter account focused on \
+AI, ML, and tech news.
 
-Content:
-{content}
+Evaluate each of the articles and provide, for every article:
+1. id: The article id exactly as given.
+2. Relevance score (1-10): How relevant is this to AI/ML/tech enthusiasts?
+3. Newsworthiness score (1-10): How timely and significant is this news?
+4. Brief summary (max 280 chars): Key takeaway in one sentence.
+
+Return exactly one entry per article.
 """
 
-TWEET_PROMPT = """You are a tech news curator for X (Twitter). Create an engaging tweet.
+SCORE_AND_TWEET_INSTRUCTIONS = """\
+You are a tech news curator for a Twitter account focused on AI, ML, and tech news.
+
+Evaluate the article and provide:
+1. Relevance score (1-10): How relevant is this to AI/ML/tech enthusiasts?
+2. Newsworthiness score (1-10): How timely and significant is this news?
+3. Brief summary (max 280 chars): Key takeaway in one sentence.
+
+Only if relevance is {min_relevance} or higher, also write a tweet:
+- Max 260 characters (leave room for link)
+- Highlight the most newsworthy element
+- Factual accuracy is critical
+- Professional but engaging tone
+- No hashtags in the tweet itself (provide separately)
+- Provide 1-2 relevant hashtags
+Otherwise leave tweet empty and hashtags as an empty list.
+"""
+
+TWEET_INSTRUCTIONS = """You are a tech news curator for X (Twitter). Create an engaging tweet.
 
 Requirements:
 - Max 260 characters (leave room for link)
@@ -43,9 +302,39 @@ Requirements:
 - Professional but engaging tone
 - No hashtags in the tweet itself (provide separately)
 - Provide 1-2 relevant hashtags
+"""
+
+TWEET_VARIANTS_INSTRUCTIONS = """\
+You are a tech news curator for X (Twitter). Write {count} alternative tweets.
 
+Requirements for every tweet:
+- Max 260 characters (leave room for link)
+- Highlight the most newsworthy element
+- Factual accuracy is critical
+- Professional but engaging tone
+- No hashtags in the tweet itself (provide separately)
+- Provide 1-2 relevant hashtags
+- Score (1-10): how well the tweet meets these requirements
+
+Make the candidates genuinely different (angle, hook or structure), not rewordings.
+"""
+
+# Per-article parts of the prompts
+ARTICLE_PROMPT = """Title: {title}
+
+Content:
+{content}
+"""
+
+BATCH_ARTICLE_BLOCK = """--- Article {id} ---
 Title: {title}
 
+Content:
+{content}
+"""
+
+TWEET_PROMPT = """Title: {title}
+
 Content:
 {content}
 
@@ -53,47 +342,295 @@ Content:
 """
 
 
+def build_scoring_prompt(title: str, content: str) -> str:
+    """Per-article scoring prompt (pair with SCORING_INSTRUCTIONS), with budgeted content."""
+    return ARTICLE_PROMPT.format(title=title, content=build_content(content, "score"))
+
+
 async def score_article(title: str, content: str) -> ArticleScore:
     """Score an article for relevance and newsworthiness using Gemini."""
-    from google.genai import types
+    prompt = build_scoring_prompt(title, content)
+    return await _cached_generate(
+        "score", SCORING_INSTRUCTIONS, ARTICLE_PROMPT, prompt, ArticleScore
+    )
 
-    prompt = SCORING_PROMPT.format(title=title, content=content[:2000])
-    client = get_client()
 
-    response = await client.aio.models.generate_content(
-        model=settings.GEMINI_MODEL,
-        contents=prompt,
-        config=types.GenerateContentConfig(
-            response_mime_type="application/json",
-            response_schema=ArticleScore,
-        ),
+async def score_and_generate(title: str, content: str) -> ArticleAnalysis:
+    """Score an article and, if relevant enough, draft its tweet in one Gemini call.
+
+    The tweet is dropped if the model wrote one below TWEET_MIN_RELEVANCE.
+    """
+    instructions = SCORE_AND_TWEET_INSTRUCTIONS.format(
+        min_relevance=settings.TWEET_MIN_RELEVANCE
     )
+    prompt = ARTICLE_PROMPT.format(
+        title=title, content=build_content(content, "score_and_tweet")
+    )
+    analysis = await _cached_generate(
+        "score_and_tweet", instructions, ARTICLE_PROMPT, prompt, ArticleAnalysis
+    )
+    if analysis is not None and analysis.relevance < settings.TWEET_MIN_RELEVANCE:
+        analysis.tweet = None
+        analysis.hashtags = []
+    return analysis
 
-    return response.parsed
 
+async def _score_batch(items: list[tuple[str, str]]) -> dict[int, ArticleScore]:
+    """Score one chunk of (title, content) pairs in a single request, keyed by position."""
+    blocks = "\n".join(
+        BATCH_ARTICLE_BLOCK.format(
+            id=i, title=title, content=build_content(content, "score_batch")
+        )
+        for i, (title, content) in enumerate(items)
+    )
+    parsed = await _generate(
+        blocks,
+        list[ArticleBatchScore],
+        kind="score_batch",
+        items=len(items),
+        instructions=BATCH_SCORING_INSTRUCTIONS,
+    )
+
+    scores = {}
+    for item in parsed or []:
+        try:
+            index = int(item.id)
+        except ValueError:
+            continue
+        if 0 <= index < len(items) and index not in scores:
+            scores[index] = ArticleScore(
+                relevance=item.relevance,
+                newsworthiness=item.newsworthiness,
+                summary=item.summary,
+            )
+    return scores
 
-async def generate_tweet(
-    title: str, content: str, feedback: str | None = None
-) -> TweetOutput:
-    """Generate a tweet for an article using Gemini with native structured output."""
-    from google.genai import types
 
+async def score_articles(articles: dict[str, tuple[str, str]]) -> dict[str, ArticleScore]:
+    """Score many articles with one Gemini request per SCORING_BATCH_SIZE chunk.
+
+    Takes {article_id: (title, content)} and returns {article_id: ArticleScore}.
+    Articles already in the response cache are not sent; batch results are
+    cached under the same keys as single score_article calls.
+    Articles missing from a batch response, or whose batch failed validation,
+    are retried with single score_article calls; ones that still fail are omitted.
+    """
+    results: dict[str, ArticleScore] = {}
+    keys: dict[str, str] = {}
+    cache = get_response_cache()
+    if settings.AI_CACHE_ENABLED:
+        for article_id, (title, content) in articles.items():
+            prompt = build_scoring_prompt(title, content)
+            keys[article_id] = cache.make_key(
+                "score", settings.GEMINI_MODEL, SCORING_INSTRUCTIONS + ARTICLE_PROMPT, prompt
+            )
+            cached = await cache.get(keys[article_id], ArticleScore)
+            if cached is not None:
+                results[article_id] = cached
+
+    ids = [a for a in articles if a not in results]
+    size = max(1, settings.SCORING_BATCH_SIZE)
+    chunks = [ids[i:i + size] for i in range(0, len(ids), size)]
+
+    async def run_chunk(chunk: list[str]) -> dict[str, ArticleScore]:
+        try:
+            by_index = await _score_batch([articles[a] for a in chunk])
+        except Exception as e:
+            logger.warning(f"[AI] Batch scoring of {len(chunk)} articles failed: {e}")
+            by_index = {}
+        return {chunk[i]: score for i, score in by_index.items()}
+
+    for chunk_scores in await asyncio.gather(*(run_chunk(c) for c in chunks)):
+        results.update(chunk_scores)
+        for article_id, score in chunk_scores.items():
+            if article_id in keys:
+                await cache.set(keys[article_id], score, ArticleScore)
+
+    missing = [a for a in ids if a not in results]
+    if missing:
+        logger.info(f"[AI] Falling back to single scoring for {len(missing)} articles")
+        singles = await asyncio.gather(
+            *(score_article(*articles[a]) for a in missing), return_exceptions=True
+        )
+        for article_id, score in zip(missing, singles):
+            if isinstance(score, Exception):
+                logger.warning(f"[AI] Scoring failed for article {article_id}: {score}")
+            elif score is not None:
+                results[article_id] = score
+
+    return results
+
+
+def _tweet_prompt(title: str, content: str, feedback: str | None) -> str:
     feedback_section = ""
     if feedback:
         feedback_section = f"Previous feedback to incorporate: {feedback}"
 
-    prompt = TWEET_PROMPT.format(
-        title=title, content=content[:2000], feedback_section=feedback_section
+    return TWEET_PROMPT.format(
+        title=title,
+        content=build_content(content, "tweet"),
+        feedback_section=feedback_section,
     )
-    client = get_client()
 
-    response = await client.aio.models.generate_content(
-        model=settings.GEMINI_MODEL,
-        contents=prompt,
-        config=types.GenerateContentConfig(
-            response_mime_type="application/json",
-            response_schema=TweetOutput,
-        ),
+
+async def generate_tweet(
+    title: str,
+    content: str,
+    feedback: str | None = None,
+    use_cache: bool = True,
+    priority: Priority = Priority.BULK,
+    variants: int = 1,
+) -> TweetOutput:
+    """Generate a tweet for an article using Gemini with native structured output.
+
+    Pass use_cache=False when the caller wants a fresh tweet (regeneration),
+    and Priority.INTERACTIVE when a user is waiting on the result.
+    With variants > 1, one request asks for that many candidates and the
+    result is a TweetCandidates: the best-scoring tweet plus the others as
+    ranked alternatives.
+    """
+    prompt = _tweet_prompt(title, content, feedback)
+    if variants > 1:
+        return await _generate_tweet_variants(prompt, variants, use_cache, priority)
+    return await _cached_generate(
+        "tweet", TWEET_INSTRUCTIONS, TWEET_PROMPT, prompt, TweetOutput, use_cache, priority
     )
 
-    return response.parsed
+
+async def _generate_tweet_variants(
+    prompt: str, count: int, use_cache: bool, priority: Priority
+) -> TweetCandidates:
+    parsed = await _cached_generate(
+        "tweet_variants",
+        TWEET_VARIANTS_INSTRUCTIONS.format(count=count),
+        TWEET_PROMPT,
+        prompt,
+        list[TweetOutput],
+        use_cache,
+        priority,
+    )
+
+    # Best first; drop verbatim repeats
+    ranked = []
+    for candidate in sorted(parsed or [], key=lambda t: t.score, reverse=True):
+        if all(candidate.tweet != r.tweet for r in ranked):
+            ranked.append(candidate)
+    if not ranked:
+        raise ValueError("Gemini returned no valid tweet candidates")
+    best, alternatives = ranked[0], ranked[1:count]
+    return TweetCandidates(**best.model_dump(), alternatives=alternatives)
+
+
+def _decode_partial_string(raw: str) -> tuple[str, bool]:
+    """Decode a JSON string body that may be cut off mid-stream.
+
+    Returns the decoded text so far and whether the closing quote was reached.
+    An escape sequence split across chunks is left for the next call.
+    """
+    out = []
+    i = 0
+    while i < len(raw):
+        ch = raw[i]
+        if ch == '"':
+            return "".join(out), True
+        if ch == "\\":
+            size = 6 if raw[i + 1:i + 2] == "u" else 2
+            if size == 6 and raw[i + 2:i + 4].lower() in ("d8", "d9", "da", "db"):
+                size = 12  # high surrogate: decode it together with the low half
+            if i + size > len(raw):
+                break
+            try:
+                out.append(json.loads(f'"{raw[i:i + size]}"'))
+            except ValueError:
+                pass
+            i += size
+            continue
+        out.append(ch)
+        i += 1
+    return "".join(out), False
+
+
+class StreamedField:
+    """Pulls one top-level string field out of structured JSON as it streams in."""
+
+    def __init__(self, name: str):
+        self._pattern = re.compile(rf'"{re.escape(name)}"\s*:\s*"')
+        self._start: int | None = None
+        self._emitted = 0
+        self.complete = False
+
+    def feed(self, text: str) -> str:
+        """Given all text received so far, return the field's newly decoded characters."""
+        if self.complete:
+            return ""
+        if self._start is None:
+            match = self._pattern.search(text)
+            if match is None:
+                return ""
+            self._start = match.end()
+        decoded, self.complete = _decode_partial_string(text[self._start:])
+        delta = decoded[self._emitted:]
+        self._emitted = len(decoded)
+        return delta
+
+
+async def stream_tweet(
+    title: str, content: str, feedback: str | None = None
+) -> AsyncIterator[str | TweetOutput]:
+    """Regenerate a tweet with streaming: yields tweet text fragments, then the TweetOutput.
+
+    The stream goes through the shared limiter at interactive priority and
+    holds its concurrency slot until it is drained. Opening it is bounded by
+    the interactive deadline; reading it by AI_STREAM_CHUNK_TIMEOUT_SECONDS
+    per chunk and AI_STREAM_TIMEOUT_SECONDS overall (TimeoutError). The full
+    response is validated against TweetOutput at the end (a ValidationError
+    propagates to the caller). Never cached.
+    """
+    client = get_client()
+    limiter = get_limiter()
+    prompt = _tweet_prompt(title, content, feedback)
+    cached_content = await _prefix_for(TWEET_INSTRUCTIONS)
+    sent = prompt if cached_content else TWEET_INSTRUCTIONS + prompt
+    estimated_tokens = len(sent) // 4 + OUTPUT_TOKEN_ESTIMATE
+
+    async def open_stream():
+        return await client.aio.models.generate_content_stream(
+            model=settings.GEMINI_MODEL,
+            contents=prompt,
+            config=_request_config(TweetOutput, TWEET_INSTRUCTIONS, cached_content),
+        )
+
+    # The deadline covers opening the stream (time to first response)
+    histogram = get_histogram("tweet_stream")
+    timeout, _ = _deadline("tweet_stream", Priority.INTERACTIVE)
+
+    async def attempt():
+        return await run_hedged(open_stream, histogram, timeout)
+
+    field = StreamedField("tweet")
+    text = ""
+    usage = None
+    async with limiter.holding(
+        attempt, estimated_tokens=estimated_tokens, priority=Priority.INTERACTIVE
+    ) as stream:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.AI_STREAM_TIMEOUT_SECONDS
+        chunks = stream.__aiter__()
+        while True:
+            remaining = deadline - loop.time()
+            try:
+                chunk = await asyncio.wait_for(
+                    chunks.__anext__(),
+                    min(settings.AI_STREAM_CHUNK_TIMEOUT_SECONDS, max(remaining, 0)),
+                )
+            except StopAsyncIteration:
+                break
+            text += chunk.text or ""
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            delta = field.feed(text)
+            if delta:
+                yield delta
+
+    if usage is not None:
+        _record_usage("tweet_stream", usage, 1)
+    yield TweetOutput.model_validate_json(text)
@@ -0,0 +1,158 @@
+"""Persistent cache for Gemini structured responses.
+
+Entries are keyed by call kind, model, prompt template version and a hash of
+the rendered prompt, so identical inputs never hit Gemini twice. Stored in a
+local SQLite file with a TTL and LRU eviction beyond a maximum entry count.
+SQLite work runs in a worker thread to keep the event loop free.
+"""
+
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def template_version(template: str) -> str:
+    """Short fingerprint of a prompt template; changes whenever its text does."""
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:12]
+
+
+class ResponseCache:
+    """SQLite-backed response cache with TTL, size-bounded eviction and hit/miss counters."""
+
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(kind: str, model: str, template: str, prompt: str) -> str:
+        content_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return f"{kind}:{model}:{template_version(template)}:{content_hash}"
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                       key TEXT PRIMARY KEY,
+                       value TEXT NOT NULL,
+                       created_at REAL NOT NULL,
+                       accessed_at REAL NOT NULL
+                   )"""
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _get_sync(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            return row[0]
+
+    def _set_sync(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+            count = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                excess = count - self.max_entries
+                conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                    (excess,),
+                )
+                self.evictions += excess
+            conn.commit()
+
+    def _count_sync(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    async def get(self, key: str, schema: Any) -> Any:
+        """Return the cached response validated against schema, or None on a miss."""
+        try:
+            raw = await asyncio.to_thread(self._get_sync, key)
+            value = TypeAdapter(schema).validate_json(raw) if raw is not None else None
+        except Exception as e:
+            logger.warning(f"[AI-CACHE] Read failed: {e}")
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any, schema: Any) -> None:
+        """Store a parsed response; failures are logged and ignored."""
+        if value is None:
+            return
+        try:
+            raw = TypeAdapter(schema).dump_json(value).decode("utf-8")
+            await asyncio.to_thread(self._set_sync, key, raw)
+        except Exception as e:
+            logger.warning(f"[AI-CACHE] Write failed: {e}")
+
+    async def stats(self) -> dict:
+        total = self.hits + self.misses
+        try:
+            entries = await asyncio.to_thread(self._count_sync)
+        except Exception:
+            entries = None
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else None,
+            "evictions": self.evictions,
+            "entries": entries,
+            "max_entries": self.max_entries,
+        }
+
+
+# Singleton instance
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            settings.AI_CACHE_PATH,
+            ttl_seconds=settings.AI_CACHE_TTL_HOURS * 3600,
+            max_entries=settings.AI_CACHE_MAX_ENTRIES,
+        )
+    return _response_cache
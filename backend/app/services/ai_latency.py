@@ -0,0 +1,147 @@
+"""Latency tracking, per-call deadlines and hedged requests for Gemini calls.
+
+Each call kind (score, tweet, ...) has a LatencyHistogram: fixed buckets for
+the /api/metrics view plus a window of recent samples for quantiles.
+run_hedged runs one attempt under a deadline and, once the attempt has taken
+longer than the kind's recent p95 (AI_HEDGE_QUANTILE), fires a second
+identical request and returns whichever succeeds first. The hedge needs its
+own concurrency slot: when none is free it is skipped, so hedging never
+pushes in-flight calls past the limiter's adaptive limit.
+"""
+
+import asyncio
+import bisect
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Optional
+
+# Bucket upper bounds in seconds; the last bucket is everything above
+BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+# Recent samples kept for quantiles, and the minimum before hedging kicks in
+WINDOW = 500
+MIN_SAMPLES = 20
+
+
+class LatencyHistogram:
+    """Bucketed latency counts plus a sliding window for quantile estimates."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.timeouts = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.hedges_skipped = 0
+        self._recent: deque[float] = deque(maxlen=WINDOW)
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self._recent.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """q-quantile of recent samples, or None until MIN_SAMPLES have been seen."""
+        if len(self._recent) < MIN_SAMPLES:
+            return None
+        ordered = sorted(self._recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def stats(self) -> dict:
+        count = sum(self.counts)
+        labels = [f"le_{b:g}s" for b in BUCKETS] + ["inf"]
+        quantiles = {
+            name: round(value * 1000, 1) if value is not None else None
+            for name, value in (
+                ("p50_ms", self.quantile(0.5)),
+                ("p95_ms", self.quantile(0.95)),
+                ("p99_ms", self.quantile(0.99)),
+            )
+        }
+        return {
+            "count": count,
+            "avg_ms": round(1000 * self.total / count, 1) if count else None,
+            **quantiles,
+            "timeouts": self.timeouts,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedges_skipped": self.hedges_skipped,
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+_histograms: dict[str, LatencyHistogram] = {}
+
+
+def get_histogram(kind: str) -> LatencyHistogram:
+    if kind not in _histograms:
+        _histograms[kind] = LatencyHistogram()
+    return _histograms[kind]
+
+
+def latency_stats() -> dict:
+    return {kind: h.stats() for kind, h in _histograms.items()}
+
+
+async def run_hedged(
+    call: Callable[[], Awaitable[Any]],
+    histogram: LatencyHistogram,
+    timeout: float,
+    hedge_after: Optional[float] = None,
+    before_hedge: Optional[Callable[[], Awaitable[bool]]] = None,
+    after_hedge: Optional[Callable[[], None]] = None,
+) -> Any:
+    """Run `call` with a deadline, optionally hedging it with a second copy.
+
+    If `hedge_after` is set and the first attempt is still running after that
+    many seconds, `before_hedge` is awaited (e.g. to take a concurrency slot
+    and a request token); if it returns False the hedge is skipped, otherwise
+    a second attempt starts and `after_hedge` is called once both attempts
+    are finished (to give the slot back). The first successful result wins
+    and the other attempt is cancelled. Raises TimeoutError when nothing succeeds
+    within `timeout`, or the last attempt's error if all of them fail.
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    primary = asyncio.create_task(call())
+    pending = {primary}
+    hedged = hedge_after is None
+    hedge_started = False
+    error: Optional[BaseException] = None
+    try:
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            wait_for = deadline - now
+            if not hedged:
+                wait_for = min(wait_for, max(0.0, start + hedge_after - now))
+            done, pending = await asyncio.wait(
+                pending, timeout=wait_for, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    histogram.observe(time.monotonic() - start)
+                    if task is not primary:
+                        histogram.hedge_wins += 1
+                    return task.result()
+                error = task.exception()
+
+            if not hedged and pending and time.monotonic() - start >= hedge_after:
+                hedged = True
+                if before_hedge is not None and not await before_hedge():
+                    histogram.hedges_skipped += 1
+                    continue
+                histogram.hedges += 1
+                hedge_started = True
+                pending.add(asyncio.create_task(call()))
+    finally:
+        for task in pending:
+            task.cancel()
+        if hedge_started and after_hedge is not None:
+            after_hedge()
+
+    if not pending and error is not None:
+        raise error
+    histogram.timeouts += 1
+    raise TimeoutError(f"Gemini call exceeded {timeout:.0f}s deadline")
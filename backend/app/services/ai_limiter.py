@@ -0,0 +1,282 @@
+"""Adaptive rate limiting and retries for Gemini calls.
+
+Every Gemini request passes through one shared AdaptiveLimiter:
+- token buckets cap requests per minute and tokens per minute,
+- an AIMD concurrency limit grows by ~1 per window of successful calls and
+  halves on a 429, so bulk ingest settles just under the quota,
+- retryable errors (429/5xx, attempt timeouts) are retried with jittered
+  exponential backoff,
+  honouring Retry-After / RetryInfo when Gemini provides one,
+- waiting calls get free slots in priority order, so an interactive request
+  (a moderator regenerating a tweet) jumps ahead of queued bulk ingest.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import re
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_CODES = {429, 500, 502, 503, 504}
+
+
+class Priority(IntEnum):
+    """Queue priority for a Gemini call; lower values are served first."""
+    INTERACTIVE = 0
+    BULK = 1
+
+
+def error_code(exc: Exception) -> Optional[int]:
+    """HTTP status of a google-genai APIError (or anything with an int .code)."""
+    code = getattr(exc, "code", None)
+    return code if isinstance(code, int) else None
+
+
+def retry_after_seconds(exc: Exception) -> Optional[float]:
+    """Server-requested delay from a Retry-After header or a google.rpc.RetryInfo detail."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if headers:
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return max(float(value), 0.0)
+            except ValueError:
+                pass
+
+    details = getattr(exc, "details", None)
+    if isinstance(details, dict):
+        for item in details.get("error", {}).get("details", []) or []:
+            delay = item.get("retryDelay") if isinstance(item, dict) else None
+            match = re.fullmatch(r"([\d.]+)s", delay or "")
+            if match:
+                return float(match.group(1))
+    return None
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute, up to one minute's worth; 0 disables it."""
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self._tokens = float(per_minute)
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.per_minute, self._tokens + (now - self._updated) * self.per_minute / 60
+        )
+        self._updated = now
+
+    async def acquire(self, amount: float = 1) -> None:
+        """Wait until `amount` units are available, then take them."""
+        if self.per_minute <= 0:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        amount = min(amount, self.per_minute)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) * 60 / self.per_minute)
+
+    def adjust(self, delta: float) -> None:
+        """Give back (positive) or charge extra (negative) units after the fact."""
+        if self.per_minute <= 0:
+            return
+        self._refill()
+        self._tokens = min(self.per_minute, self._tokens + delta)
+
+
+class AdaptiveLimiter:
+    """Shared RPM/TPM buckets, AIMD concurrency and retry policy for Gemini calls."""
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        max_retries: int = 4,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = float(self.max_concurrency)
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.in_flight = 0
+        self.retries = 0
+        self.throttled = 0
+        self._last_decrease = 0.0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._queue_stats = {
+            p: {"depth": 0, "acquired": 0, "total_wait": 0.0, "max_wait": 0.0}
+            for p in Priority
+        }
+
+    def _wake(self) -> None:
+        """Hand free slots to waiters, highest priority (then oldest) first."""
+        while self._waiters and self.in_flight < int(self.limit):
+            _, _, future = heapq.heappop(self._waiters)
+            if future.cancelled():
+                continue
+            self.in_flight += 1
+            future.set_result(None)
+
+    async def _acquire_slot(self, priority: Priority) -> None:
+        start = time.monotonic()
+        stats = self._queue_stats[priority]
+        if self._waiters or self.in_flight >= int(self.limit):
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (int(priority), next(self._seq), future))
+            stats["depth"] += 1
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self._release_slot()
+                raise
+            finally:
+                stats["depth"] -= 1
+        else:
+            self.in_flight += 1
+
+        waited = time.monotonic() - start
+        stats["acquired"] += 1
+        stats["total_wait"] += waited
+        stats["max_wait"] = max(stats["max_wait"], waited)
+
+    def _release_slot(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def try_acquire_slot(self) -> bool:
+        """Take a free concurrency slot without queueing (False if none is free)."""
+        if self._waiters or self.in_flight >= int(self.limit):
+            return False
+        self.in_flight += 1
+        return True
+
+    def release_slot(self) -> None:
+        """Give back a slot taken with try_acquire_slot."""
+        self._release_slot()
+
+    def _on_success(self) -> None:
+        # Additive increase: about +1 slot per `limit` successful calls
+        self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+        self._wake()
+
+    def _on_throttle(self) -> None:
+        # Multiplicative decrease, at most once per second for a burst of 429s
+        self.throttled += 1
+        now = time.monotonic()
+        if now - self._last_decrease >= 1.0:
+            self.limit = max(1.0, self.limit / 2)
+            self._last_decrease = now
+
+    def backoff(self, attempt: int, exc: Exception) -> float:
+        """Delay before retry `attempt` (0-based): Retry-After if given, else full jitter."""
+        server_delay = retry_after_seconds(exc)
+        if server_delay is not None:
+            return min(server_delay, self.max_delay) + random.uniform(0, self.base_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[Any]],
+        estimated_tokens: int = 0,
+        priority: Priority = Priority.BULK,
+    ) -> Any:
+        """Run `call` under the rate limits, retrying retryable failures."""
+        return await self._run(call, estimated_tokens, priority, keep_slot=False)
+
+    @asynccontextmanager
+    async def holding(
+        self,
+        call: Callable[[], Awaitable[Any]],
+        estimated_tokens: int = 0,
+        priority: Priority = Priority.BULK,
+    ) -> AsyncIterator[Any]:
+        """Like run(), but the concurrency slot is held until the block exits.
+
+        For streamed responses, whose work happens after `call` returns.
+        """
+        result = await self._run(call, estimated_tokens, priority, keep_slot=True)
+        try:
+            yield result
+        finally:
+            self._release_slot()
+
+    async def _run(
+        self,
+        call: Callable[[], Awaitable[Any]],
+        estimated_tokens: int,
+        priority: Priority,
+        keep_slot: bool,
+    ) -> Any:
+        attempt = 0
+        while True:
+            await self._acquire_slot(priority)
+            succeeded = False
+            try:
+                await self.requests.acquire(1)
+                await self.tokens.acquire(estimated_tokens)
+                result = await call()
+                succeeded = True
+            except Exception as e:
+                code = error_code(e)
+                if code == 429:
+                    self._on_throttle()
+                retryable = code in RETRYABLE_CODES or isinstance(e, TimeoutError)
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                reason = code or "a timeout"
+                delay = self.backoff(attempt, e)
+            else:
+                self._on_success()
+                return result
+            finally:
+                if not (succeeded and keep_slot):
+                    self._release_slot()
+
+            attempt += 1
+            self.retries += 1
+            logger.warning(
+                f"[AI] Gemini returned {reason}, retry {attempt}/{self.max_retries} "
+                f"in {delay:.1f}s (concurrency limit {self.limit:.1f})"
+            )
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        return {
+            "concurrency_limit": round(self.limit, 2),
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "queues": {
+                p.name.lower(): {
+                    "depth": q["depth"],
+                    "acquired": q["acquired"],
+                    "avg_wait_ms": round(1000 * q["total_wait"] / q["acquired"], 1)
+                    if q["acquired"] else None,
+                    "max_wait_ms": round(1000 * q["max_wait"], 1),
+                }
+                for p, q in self._queue_stats.items()
+            },
+        }
@@ -0,0 +1,139 @@
+"""Gemini context caching for the static instruction prefix of each prompt.
+
+Every scoring / tweet prompt starts with the same instruction block; only the
+article part changes. PrefixCache keeps one Gemini cached content per
+(model, instructions) pair, refreshes its TTL shortly before expiry and hands
+out its name so requests send just the article part.
+
+When a cache cannot be used (instructions below Gemini's minimum cacheable
+size, caching unsupported for the model, API errors) get() returns None and
+the caller sends the instructions as a plain system_instruction instead. The
+static prefix then still comes first, which Gemini's implicit caching can
+pick up. A failed key is not retried until PROMPT_CACHE_RETRY_MINUTES pass.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from app.core.config import settings
+from app.services.ai_cache import template_version
+from app.services.prompt_builder import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Refresh the TTL when less than this fraction of it is left
+REFRESH_FRACTION = 0.2
+
+
+@dataclass
+class _Entry:
+    name: Optional[str]
+    expires_at: float  # for a failed key: when to try again
+
+
+class PrefixCache:
+    """Creates, refreshes and hands out cached-content names for instruction prefixes."""
+
+    def __init__(self, client_factory, ttl_seconds: float, retry_seconds: float, min_tokens: int):
+        self._client_factory = client_factory
+        self.ttl_seconds = ttl_seconds
+        self.retry_seconds = retry_seconds
+        self.min_tokens = min_tokens
+        self._entries: dict[str, _Entry] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self.hits = 0
+        self.created = 0
+        self.refreshed = 0
+        self.failures = 0
+        self.skipped = 0
+
+    @staticmethod
+    def _key(model: str, instructions: str) -> str:
+        return f"{model}:{template_version(instructions)}"
+
+    async def get(self, model: str, instructions: str) -> Optional[str]:
+        """Name of a live cached content holding `instructions`, or None to send them inline."""
+        if estimate_tokens(instructions) < self.min_tokens:
+            self.skipped += 1
+            return None
+        key = self._key(model, instructions)
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry and entry.name and entry.expires_at - now > self.ttl_seconds * REFRESH_FRACTION:
+            self.hits += 1
+            return entry.name
+        if entry and entry.name is None and now < entry.expires_at:
+            return None
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Another caller may have created or refreshed it while we waited
+            entry = self._entries.get(key)
+            now = time.monotonic()
+            if (
+                entry and entry.name
+                and entry.expires_at - now > self.ttl_seconds * REFRESH_FRACTION
+            ):
+                self.hits += 1
+                return entry.name
+            if entry and entry.name is None and now < entry.expires_at:
+                return None
+            try:
+                if entry and entry.name and entry.expires_at > now:
+                    await self._refresh(entry.name)
+                    self.refreshed += 1
+                    name = entry.name
+                else:
+                    name = await self._create(model, instructions)
+                    self.created += 1
+            except Exception as e:
+                self.failures += 1
+                logger.info(
+                    f"[AI] Prompt prefix caching unavailable ({e}); "
+                    f"sending instructions inline for {self.retry_seconds / 60:.0f} min"
+                )
+                self._entries[key] = _Entry(name=None, expires_at=now + self.retry_seconds)
+                return None
+            self._entries[key] = _Entry(name=name, expires_at=now + self.ttl_seconds)
+            return name
+
+    async def _create(self, model: str, instructions: str) -> str:
+        from google.genai import types
+
+        cache = await self._client_factory().aio.caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(
+                system_instruction=instructions,
+                ttl=f"{int(self.ttl_seconds)}s",
+                display_name=f"twax-prefix-{template_version(instructions)}",
+            ),
+        )
+        return cache.name
+
+    async def _refresh(self, name: str) -> None:
+        from google.genai import types
+
+        await self._client_factory().aio.caches.update(
+            name=name,
+            config=types.UpdateCachedContentConfig(ttl=f"{int(self.ttl_seconds)}s"),
+        )
+
+    def invalidate(self, name: str) -> None:
+        """Forget a cached content the API no longer accepts (expired or deleted)."""
+        for key, entry in list(self._entries.items()):
+            if entry.name == name:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.PROMPT_CACHE_ENABLED,
+            "live": sum(1 for e in self._entries.values() if e.name),
+            "hits": self.hits,
+            "created": self.created,
+            "refreshed": self.refreshed,
+            "failures": self.failures,
+            "below_min_tokens": self.skipped,
+        }
@@ -0,0 +1,298 @@
+"""Backlog scoring through an asynchronous batch job.
+
+After an outage or when new feeds are added, thousands of stored articles can
+be left unscored. Instead of calling score_article once per row, the backlog
+runner submits them all as one batch job (Gemini Batch API: cheaper, no
+per-request rate limits), polls until the job finishes and bulk-writes the
+scores back to `articles`.
+
+BATCH_SCORING_BACKEND selects the backend: "gemini" for the real Batch API,
+or "local" for an in-process stand-in that returns deterministic scores after
+a short delay, so the whole flow can be tested offline. Local runs are always
+dry runs: their fake scores are never written to `articles`.
+
+Large backlogs are split into jobs of BATCH_JOB_MAX_REQUESTS. Submitted job
+names are saved to BATCH_JOBS_PATH, so a run that times out is resumed by the
+next one instead of resubmitting the same rows.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional, Protocol
+from uuid import UUID
+
+from app.core.config import settings
+from app.models import ArticleScore
+from app.services import database as db
+from app.services.ai import SCORING_INSTRUCTIONS, build_scoring_prompt, get_client
+
+logger = logging.getLogger(__name__)
+
+SUCCEEDED = "JOB_STATE_SUCCEEDED"
+TERMINAL_STATES = {
+    "JOB_STATE_SUCCEEDED",
+    "JOB_STATE_PARTIALLY_SUCCEEDED",
+    "JOB_STATE_FAILED",
+    "JOB_STATE_CANCELLED",
+    "JOB_STATE_EXPIRED",
+}
+
+
+@dataclass
+class BatchRequest:
+    """One prompt in a batch job; key ties the response back to an article."""
+    key: str
+    prompt: str
+
+
+@dataclass
+class BatchStatus:
+    """Job state plus, once finished, raw JSON responses keyed by request key."""
+    state: str
+    results: Optional[dict[str, str]] = None
+
+
+class BatchBackend(Protocol):
+    async def submit(self, requests: list[BatchRequest]) -> str: ...
+    async def poll(self, name: str) -> BatchStatus: ...
+
+
+class GeminiBatchBackend:
+    """Gemini Batch API with inlined requests and structured ArticleScore output."""
+
+    async def submit(self, requests: list[BatchRequest]) -> str:
+        from google.genai import types
+
+        inlined = [
+            types.InlinedRequest(
+                contents=r.prompt,
+                metadata={"key": r.key},
+                config=types.GenerateContentConfig(
+                    response_mime_type="application/json",
+                    response_schema=ArticleScore,
+                    system_instruction=SCORING_INSTRUCTIONS,
+                ),
+            )
+            for r in requests
+        ]
+        job = await get_client().aio.batches.create(
+            model=settings.GEMINI_MODEL,
+            src=inlined,
+            config=types.CreateBatchJobConfig(
+                display_name=f"twax-backlog-{datetime.now(timezone.utc):%Y%m%d-%H%M%S}"
+            ),
+        )
+        return job.name
+
+    async def poll(self, name: str) -> BatchStatus:
+        job = await get_client().aio.batches.get(name=name)
+        state = job.state.value if hasattr(job.state, "value") else str(job.state)
+        if state not in TERMINAL_STATES:
+            return BatchStatus(state=state)
+
+        results = {}
+        inlined = (job.dest.inlined_responses if job.dest else None) or []
+        for item in inlined:
+            key = (item.metadata or {}).get("key")
+            if key and item.response is not None and item.response.text:
+                results[key] = item.response.text
+        return BatchStatus(state=state, results=results)
+
+
+class LocalBatchBackend:
+    """In-process stand-in for the Batch API, for offline tests and dry runs.
+
+    Jobs finish `completion_seconds` after submission. Scores are derived from
+    a hash of each prompt, so the same input always gets the same output;
+    `fail_every` > 0 drops every n-th response to exercise partial failures.
+    """
+
+    def __init__(self, completion_seconds: float = 1.0, fail_every: int = 0):
+        self.completion_seconds = completion_seconds
+        self.fail_every = fail_every
+        self._jobs: dict[str, tuple[float, list[BatchRequest]]] = {}
+
+    @staticmethod
+    def respond(prompt: str) -> str:
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        return json.dumps({
+            "relevance": 1 + digest[0] % 10,
+            "newsworthiness": 1 + digest[1] % 10,
+            "summary": f"Local batch score {digest[:4].hex()}",
+        })
+
+    async def submit(self, requests: list[BatchRequest]) -> str:
+        name = f"batches/local-{len(self._jobs) + 1}"
+        self._jobs[name] = (time.monotonic(), requests)
+        return name
+
+    async def poll(self, name: str) -> BatchStatus:
+        submitted, requests = self._jobs[name]
+        if time.monotonic() - submitted < self.completion_seconds:
+            return BatchStatus(state="JOB_STATE_RUNNING")
+        results = {
+            r.key: self.respond(r.prompt)
+            for i, r in enumerate(requests, start=1)
+            if not (self.fail_every and i % self.fail_every == 0)
+        }
+        return BatchStatus(state=SUCCEEDED, results=results)
+
+
+_local_backend: Optional[LocalBatchBackend] = None
+
+
+def get_batch_backend() -> BatchBackend:
+    """Backend selected by BATCH_SCORING_BACKEND ("gemini" or "local")."""
+    global _local_backend
+    if settings.BATCH_SCORING_BACKEND == "local":
+        if _local_backend is None:
+            _local_backend = LocalBatchBackend()
+        return _local_backend
+    return GeminiBatchBackend()
+
+
+# Status of the most recent backlog run, for the admin status endpoint
+last_run: dict = {}
+
+
+def _load_jobs(path: str) -> Optional[dict]:
+    """Jobs of an unfinished earlier run ({"jobs": [...], "submitted": n}), if any."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"[BACKLOG] Ignoring unreadable job file: {e}")
+        return None
+
+
+def _save_jobs(path: str, jobs: list[str], submitted: int) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"jobs": jobs, "submitted": submitted}, f)
+    os.replace(tmp_path, path)
+
+
+def _clear_jobs(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _overall_state(states: dict[str, str], any_results: bool) -> str:
+    distinct = set(states.values())
+    if len(distinct) == 1:
+        return distinct.pop()
+    return "JOB_STATE_PARTIALLY_SUCCEEDED" if any_results else "JOB_STATE_FAILED"
+
+
+async def score_backlog(
+    limit: int = 1000,
+    backend: Optional[BatchBackend] = None,
+    poll_seconds: Optional[float] = None,
+    dry_run: bool = False,
+    jobs_path: Optional[str] = None,
+) -> dict:
+    """Score up to `limit` unscored articles through batch jobs and write the scores back.
+
+    With dry_run (forced for the local backend) nothing is written and no
+    jobs are saved for resumption. If an earlier run timed out, its jobs are
+    polled again instead of submitting new ones.
+    """
+    backend = backend or get_batch_backend()
+    if isinstance(backend, LocalBatchBackend):
+        dry_run = True  # deterministic fake scores must never reach `articles`
+    poll_seconds = settings.BATCH_POLL_SECONDS if poll_seconds is None else poll_seconds
+    jobs_path = jobs_path or settings.BATCH_JOBS_PATH
+    deadline = time.monotonic() + settings.BATCH_TIMEOUT_HOURS * 3600
+
+    last_run.clear()
+    last_run.update({
+        "state": "LOADING",
+        "dry_run": dry_run,
+        "started_at": datetime.now(timezone.utc).isoformat(),
+    })
+
+    pending = None if dry_run else _load_jobs(jobs_path)
+    if pending and pending.get("jobs"):
+        jobs, submitted = pending["jobs"], pending["submitted"]
+        last_run["resumed"] = True
+        logger.info(f"[BACKLOG] Resuming {len(jobs)} jobs from an earlier run")
+    else:
+        rows = await db.get_unscored_articles(limit)
+        if not rows:
+            last_run.update({"state": "EMPTY", "submitted": 0, "scored": 0})
+            return dict(last_run)
+
+        requests = [
+            BatchRequest(
+                key=str(row["id"]),
+                prompt=build_scoring_prompt(row["title"], row["content"]),
+            )
+            for row in rows
+        ]
+        submitted = len(requests)
+        chunk_size = max(1, settings.BATCH_JOB_MAX_REQUESTS)
+        jobs = []
+        for start in range(0, submitted, chunk_size):
+            jobs.append(await backend.submit(requests[start:start + chunk_size]))
+            if not dry_run:
+                _save_jobs(jobs_path, jobs, submitted)
+        logger.info(f"[BACKLOG] Submitted {submitted} articles as {len(jobs)} jobs")
+    last_run.update({"jobs": jobs, "state": "SUBMITTED", "submitted": submitted})
+
+    results: dict[str, str] = {}
+    states: dict[str, str] = {}
+    remaining = list(jobs)
+    while True:
+        for job in list(remaining):
+            status = await backend.poll(job)
+            states[job] = status.state
+            if status.state in TERMINAL_STATES:
+                results.update(status.results or {})
+                remaining.remove(job)
+        if not remaining:
+            break
+        last_run["state"] = "RUNNING"
+        if time.monotonic() > deadline:
+            logger.warning(f"[BACKLOG] {len(remaining)} jobs still running at timeout")
+            last_run.update({"state": "TIMEOUT", "pending_jobs": remaining})
+            return dict(last_run)
+        await asyncio.sleep(poll_seconds)
+    last_run["state"] = _overall_state(states, bool(results))
+
+    scores = []
+    for key, raw in results.items():
+        try:
+            score = ArticleScore.model_validate_json(raw)
+        except Exception as e:
+            logger.warning(f"[BACKLOG] Invalid score for {key}: {e}")
+            continue
+        scores.append((key, score))
+
+    if dry_run:
+        updated = 0
+    else:
+        updated = await db.update_article_scores(
+            [(s.relevance, s.newsworthiness, s.summary, UUID(key)) for key, s in scores]
+        )
+        _clear_jobs(jobs_path)
+    last_run.update({
+        "scored": updated,
+        "valid": len(scores),
+        "failed": submitted - len(scores),
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+    })
+    logger.info(
+        f"[BACKLOG] {last_run['state']}: {len(scores)} valid scores, {updated} written, "
+        f"{last_run['failed']} failed{' (dry run)' if dry_run else ''}"
+    )
+    return dict(last_run)
@@ -5,11 +5,17 @@ All heavy imports happen on first database call, not at module level.
 """
 
 from datetime import datetime, timezone
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from uuid import UUID, uuid4
 
 from app.core.config import settings
 from app.db.models import Article
+from app.services.embeddings import pack_embedding, unpack_embedding
+from app.services.urls import canonicalize_url
+from app.services.vector_index import get_vector_index
+
+if TYPE_CHECKING:
+    import numpy as np
 
 # Connection pool (lazy-initialized)
 _pool = None
@@ -38,6 +44,7 @@ def _row_to_article(row) -> Article:
         id=row["id"],
         title=row["title"],
         url=row["url"],
+        canonical_url=row.get("canonical_url"),
         content=row["content"],
         source=row["source"],
         published_at=row.get("published_at"),
@@ -47,13 +54,19 @@ def _row_to_article(row) -> Article:
         summary=row.get("summary"),
         generated_tweet=row.get("generated_tweet"),
         hashtags=row.get("hashtags") or [],
-        embedding=row.get("embedding"),
+        embedding=unpack_embedding(row.get("embedding")),
         status=row.get("status", "pending"),
+        prefilter_score=row.get("prefilter_score"),
         moderated_at=row.get("moderated_at"),
         edited_tweet=row.get("edited_tweet"),
     )
 
 
+def _vector_literal(embedding: "np.ndarray") -> str:
+    """pgvector text form ('[x,y,...]'); sent as text so no asyncpg codec is needed."""
+    return "[" + ",".join(f"{float(x):.7g}" for x in embedding) + "]"
+
+
 def _to_naive_utc(dt: Optional[datetime]) -> Optional[datetime]:
     """Convert a datetime to naive UTC for 'timestamp without time zone' columns.
     asyncpg is strict: it refuses to mix aware and naive datetimes.
@@ -77,33 +90,54 @@ async def save_article(
     summary: Optional[str] = None,
     generated_tweet: Optional[str] = None,
     hashtags: Optional[list[str]] = None,
-    embedding: Optional[list[float]] = None,
-) -> Article:
-    """Save a new article to the database."""
+    embedding: Optional["np.ndarray"] = None,
+    status: str = "pending",
+    prefilter_score: Optional[float] = None,
+) -> Optional[Article]:
+    """Save a new article to the database (embedding: float32 array, stored packed).
+
+    Returns None if an article with the same canonical URL already exists
+    (e.g. saved by a concurrent fetch since the caller's URL check).
+    """
     pool = await get_pool()
     article_id = uuid4()
     now = datetime.utcnow()  # naive UTC — matches DB 'timestamp' columns
     pub_at = _to_naive_utc(published_at)
 
-    await pool.execute(
-        """
-        INSERT INTO articles (
-            id, title, url, content, source, published_at, created_at,
-            relevance_score, newsworthiness_score, summary,
-            generated_tweet, hashtags, embedding, status
-        ) VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9,$10,$11,$12,$13,$14)
-        """,
-        article_id, title, url, content[:10000], source, pub_at, now,
+    canonical_url = canonicalize_url(url)
+
+    values = [
+        article_id, title, url, canonical_url, content[:10000], source, pub_at, now,
         relevance_score, newsworthiness_score, summary,
-        generated_tweet, hashtags or [], embedding, "pending",
+        generated_tweet, hashtags or [], pack_embedding(embedding), status, prefilter_score,
+    ]
+    columns = """id, title, url, canonical_url, content, source, published_at, created_at,
+            relevance_score, newsworthiness_score, summary,
+            generated_tweet, hashtags, embedding, status, prefilter_score"""
+    placeholders = ",".join(f"${i}" for i in range(1, len(values) + 1))
+    if settings.DEDUP_BACKEND == "pgvector":
+        # Only this backend needs the vector column (and the pgvector extension)
+        values.append(_vector_literal(embedding) if embedding is not None else None)
+        columns += ", embedding_vec"
+        placeholders += f",${len(values)}::text::vector"
+
+    inserted = await pool.fetchval(
+        f"""INSERT INTO articles ({columns}) VALUES ({placeholders})
+            ON CONFLICT (canonical_url) DO NOTHING RETURNING id""",
+        *values,
     )
+    if inserted is None:
+        return None
+    if embedding is not None and settings.DEDUP_BACKEND != "pgvector":
+        get_vector_index().add(str(article_id), embedding, now)
 
     return Article(
-        id=article_id, title=title, url=url, content=content,
+        id=article_id, title=title, url=url, canonical_url=canonical_url, content=content,
         source=source, published_at=pub_at, created_at=now,
         relevance_score=relevance_score, newsworthiness_score=newsworthiness_score,
         summary=summary, generated_tweet=generated_tweet,
-        hashtags=hashtags or [], embedding=embedding, status="pending",
+        hashtags=hashtags or [], embedding=embedding, status=status,
+        prefilter_score=prefilter_score,
     )
 
 
@@ -121,6 +155,112 @@ async def get_article_by_url(url: str) -> Optional[Article]:
     return _row_to_article(row) if row else None
 
 
+async def get_article_id_by_url(url: str) -> Optional[UUID]:
+    """Return the ID of the article with this (canonical) URL, without loading the row."""
+    pool = await get_pool()
+    return await pool.fetchval(
+        "SELECT id FROM articles WHERE canonical_url = $1 OR url = $2 LIMIT 1",
+        canonicalize_url(url), url,
+    )
+
+
+async def get_existing_urls(urls: list[str]) -> set[str]:
+    """Return the subset of URLs already stored (by canonical URL), in one round trip.
+
+    The raw url is matched too, for rows saved before canonical_url was backfilled.
+    """
+    if not urls:
+        return set()
+    canonical = {u: canonicalize_url(u) for u in urls}
+    pool = await get_pool()
+    rows = await pool.fetch(
+        """SELECT url, canonical_url FROM articles
+           WHERE canonical_url = ANY($1::text[]) OR url = ANY($2::text[])""",
+        list(set(canonical.values())), list(set(urls)),
+    )
+    stored = {r["canonical_url"] for r in rows} | {r["url"] for r in rows}
+    return {u for u, c in canonical.items() if c in stored or u in stored}
+
+
+async def get_article_keys(limit: int) -> list:
+    """Get source, title, url, published_at and content MD5 of the most recent articles.
+
+    Only a digest of the first 5000 characters of content is returned (see
+    rss.content_digest), never the content or embedding itself.
+    """
+    pool = await get_pool()
+    return await pool.fetch(
+        """SELECT source, title, url, published_at, md5(left(content, 5000)) AS content_md5
+           FROM articles ORDER BY created_at DESC LIMIT $1""",
+        limit,
+    )
+
+
+async def _has_legacy_embeddings(pool) -> bool:
+    """Whether embedding_legacy (double precision[], see 003_embedding_bytea.sql) still exists."""
+    return await pool.fetchval(
+        """SELECT EXISTS (SELECT 1 FROM information_schema.columns
+           WHERE table_name = 'articles' AND column_name = 'embedding_legacy')"""
+    )
+
+
+async def get_recent_embeddings(limit: int, since: datetime) -> list:
+    """Get id, embedding and created_at of articles since `since`, newest first.
+
+    embedding is the packed bytes, or the embedding_legacy array for rows that
+    backfill_embedding_bytes.py has not converted yet (unpack_embedding reads both).
+    """
+    pool = await get_pool()
+    if await _has_legacy_embeddings(pool):
+        rows = await pool.fetch(
+            """SELECT id, embedding, embedding_legacy, created_at FROM articles
+               WHERE (embedding IS NOT NULL OR embedding_legacy IS NOT NULL)
+                 AND created_at >= $1
+               ORDER BY created_at DESC LIMIT $2""",
+            _to_naive_utc(since), limit,
+        )
+        return [
+            {
+                "id": r["id"],
+                "embedding": r["embedding"] if r["embedding"] is not None
+                else r["embedding_legacy"],
+                "created_at": r["created_at"],
+            }
+            for r in rows
+        ]
+    return await pool.fetch(
+        """SELECT id, embedding, created_at FROM articles
+           WHERE embedding IS NOT NULL AND created_at >= $1
+           ORDER BY created_at DESC LIMIT $2""",
+        _to_naive_utc(since), limit,
+    )
+
+
+async def find_similar_articles(
+    embedding: "np.ndarray", k: int, since: Optional[datetime] = None,
+) -> list[tuple[str, float]]:
+    """Top-k (id, cosine similarity) among articles created since `since`, best first.
+
+    Served by the HNSW index on embedding_vec (migrations/002_pgvector.sql).
+    Iterative scans keep the time-window filter from starving the result.
+    """
+    pool = await get_pool()
+    async with pool.acquire() as conn, conn.transaction():
+        await conn.execute(f"SET LOCAL hnsw.ef_search = {int(settings.PGVECTOR_EF_SEARCH)}")
+        if settings.PGVECTOR_ITERATIVE_SCAN != "off":
+            await conn.execute(
+                f"SET LOCAL hnsw.iterative_scan = {settings.PGVECTOR_ITERATIVE_SCAN}"
+            )
+        rows = await conn.fetch(
+            """SELECT id, 1 - (embedding_vec <=> $1::text::vector) AS similarity
+               FROM articles
+               WHERE embedding_vec IS NOT NULL AND ($2::timestamp IS NULL OR created_at >= $2)
+               ORDER BY embedding_vec <=> $1::text::vector LIMIT $3""",
+            _vector_literal(embedding), _to_naive_utc(since), k,
+        )
+    return [(str(r["id"]), float(r["similarity"])) for r in rows]
+
+
 async def get_pending_articles(limit: int = 20) -> list[Article]:
     """Get pending articles ordered by relevance."""
     pool = await get_pool()
@@ -147,6 +287,57 @@ async def get_articles_by_status(status: str, limit: int = 20) -> list[Article]:
     return [_row_to_article(r) for r in rows]
 
 
+async def get_unscored_articles(limit: int) -> list:
+    """Get id, title and content of pending articles that have no score yet, oldest first."""
+    pool = await get_pool()
+    return await pool.fetch(
+        """SELECT id, title, content FROM articles
+           WHERE relevance_score IS NULL AND status = 'pending'
+           ORDER BY created_at LIMIT $1""",
+        limit,
+    )
+
+
+async def update_article_scores(scores: list[tuple[int, int, str, UUID]]) -> int:
+    """Bulk-write (relevance, newsworthiness, summary, id) rows; skips already-scored rows.
+
+    Returns the number of rows actually updated.
+    """
+    if not scores:
+        return 0
+    relevance, newsworthiness, summaries, ids = (list(c) for c in zip(*scores))
+    pool = await get_pool()
+    rows = await pool.fetch(
+        """UPDATE articles AS a
+           SET relevance_score = s.relevance, newsworthiness_score = s.newsworthiness,
+               summary = s.summary
+           FROM unnest($1::int[], $2::int[], $3::text[], $4::uuid[])
+               AS s(relevance, newsworthiness, summary, id)
+           WHERE a.id = s.id AND a.relevance_score IS NULL
+           RETURNING a.id""",
+        relevance, newsworthiness, summaries, ids,
+    )
+    return len(rows)
+
+
+async def requeue_filtered_articles(limit: int) -> int:
+    """Move up to `limit` prefilter-rejected articles back to pending, highest score first.
+
+    They have no Gemini score, so the backlog scorer picks them up again.
+    """
+    pool = await get_pool()
+    rows = await pool.fetch(
+        """UPDATE articles SET status = 'pending'
+           WHERE id IN (
+               SELECT id FROM articles WHERE status = 'filtered'
+               ORDER BY prefilter_score DESC NULLS LAST LIMIT $1
+           )
+           RETURNING id""",
+        limit,
+    )
+    return len(rows)
+
+
 async def update_article_status(
     article_id: UUID, status: str, edited_tweet: Optional[str] = None,
 ) -> bool:
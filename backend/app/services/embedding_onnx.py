@@ -0,0 +1,92 @@
+"""ONNX Runtime backend for the MiniLM embedding model (EMBED_BACKEND=onnx).
+
+Runs an int8-quantized ONNX export of all-MiniLM-L6-v2 with the Rust
+`tokenizers` tokenizer, then mean-pools and L2-normalizes like the
+sentence-transformers pipeline, so vectors are interchangeable with the
+torch backend. Nothing here imports torch or sentence_transformers.
+
+The model comes from EMBED_ONNX_DIR (model file + tokenizer.json, e.g.
+baked into the image) or is downloaded from EMBED_ONNX_REPO on first use.
+"""
+
+import logging
+import os
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# all-MiniLM-L6-v2 max_seq_length (longer inputs are truncated, as in sentence-transformers)
+MAX_SEQ_LENGTH = 256
+
+
+class OnnxEmbedder:
+    """Sentence embedder with the same encode() surface as SentenceTransformer."""
+
+    def __init__(self, model_path: str, tokenizer_path: str, threads: int = 0):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length=MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            model_path, options, providers=["CPUExecutionProvider"]
+        )
+        self._inputs = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, texts, batch_size: int | None = None, convert_to_numpy: bool = True):
+        """Embed a text or list of texts; returns normalized float32 vectors."""
+        import numpy as np
+
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        batch_size = batch_size or len(texts) or 1
+        chunks = []
+        for start in range(0, len(texts), batch_size):
+            chunks.append(self._encode_chunk(texts[start:start + batch_size]))
+        vectors = np.concatenate(chunks) if chunks else np.zeros((0, 384), dtype=np.float32)
+        return vectors[0] if single else vectors
+
+    def _encode_chunk(self, texts: list[str]):
+        import numpy as np
+
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._inputs:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+        hidden = self.session.run(None, feeds)[0]  # last_hidden_state (batch, seq, dim)
+
+        # Mean pooling over real tokens, then L2 normalization
+        mask = attention_mask[..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+
+def _resolve_files() -> tuple[str, str]:
+    """Paths of the ONNX model and tokenizer.json (downloaded if no local dir is set)."""
+    if settings.EMBED_ONNX_DIR:
+        return (
+            os.path.join(settings.EMBED_ONNX_DIR, settings.EMBED_ONNX_FILE),
+            os.path.join(settings.EMBED_ONNX_DIR, "tokenizer.json"),
+        )
+
+    from huggingface_hub import hf_hub_download
+
+    model_path = hf_hub_download(settings.EMBED_ONNX_REPO, settings.EMBED_ONNX_FILE)
+    tokenizer_path = hf_hub_download(settings.EMBED_ONNX_REPO, "tokenizer.json")
+    return model_path, tokenizer_path
+
+
+def load_onnx_embedder() -> OnnxEmbedder:
+    model_path, tokenizer_path = _resolve_files()
+    logger.info(f"[EMBED] Loading ONNX model {model_path}")
+    return OnnxEmbedder(model_path, tokenizer_path, threads=settings.EMBED_ONNX_THREADS)
@@ -1,30 +1,229 @@
 """Embedding service for semantic deduplication.
 
 ALL heavy imports (numpy, sentence_transformers, torch) are lazy.
+With EMBED_BACKEND=onnx the model runs through onnxruntime instead
+(see embedding_onnx) and torch is never imported.
+
+Concurrent generate_embedding calls are micro-batched: requests arriving
+within EMBED_BATCH_WINDOW_MS (or until EMBED_BATCH_MAX_SIZE are queued) are
+encoded together in one model.encode call, which runs in a dedicated worker
+thread so the event loop stays responsive during ingest.
+
+Vectors stay float32 NumPy arrays end-to-end; in the database they are
+packed little-endian bytes (pack_embedding / unpack_embedding), float32 or,
+with EMBEDDING_STORAGE_DTYPE=float16, half precision.
+
+check_duplicate searches the in-memory VectorIndex (see vector_index), or
+with DEDUP_BACKEND=pgvector the HNSW index in Postgres.
 """
 
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING
+
+from app.core.config import settings
+from app.services.vector_index import DIMENSIONS, VectorIndex, get_vector_index
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
 _model = None
 
+# Single worker: batches are encoded one at a time (the runtime parallelizes inside a batch)
+_embed_executor: ThreadPoolExecutor | None = None
+
 
 def _get_model():
     """Lazy-load the embedding model on first use."""
     global _model
     if _model is None:
-        from sentence_transformers import SentenceTransformer
-        _model = SentenceTransformer("all-MiniLM-L6-v2")
+        if settings.EMBED_BACKEND == "onnx":
+            from app.services.embedding_onnx import load_onnx_embedder
+            _model = load_onnx_embedder()
+        else:
+            from sentence_transformers import SentenceTransformer
+            _model = SentenceTransformer("all-MiniLM-L6-v2")
     return _model
 
 
-async def generate_embedding(text: str) -> list[float]:
-    """Generate embedding vector for text using local MiniLM model."""
+def _encode_batch(texts: list[str]) -> list["np.ndarray"]:
+    """Encode a batch of texts (runs in the embedding worker thread)."""
     import numpy as np
+
     model = _get_model()
-    embedding = model.encode(text, convert_to_numpy=True)
-    return embedding.tolist()
+    vectors = model.encode(texts, batch_size=len(texts), convert_to_numpy=True)
+    return list(np.asarray(vectors, dtype=np.float32))
+
+
+def pack_embedding(embedding) -> bytes | None:
+    """Embedding as little-endian bytes for the bytea column (EMBEDDING_STORAGE_DTYPE)."""
+    if embedding is None:
+        return None
+    import numpy as np
+
+    dtype = "<f2" if settings.EMBEDDING_STORAGE_DTYPE == "float16" else "<f4"
+    return np.asarray(embedding, dtype=dtype).tobytes()
+
+
+def unpack_embedding(data) -> "np.ndarray | None":
+    """float32 vector from stored bytes (float16 is recognized by its length)."""
+    if data is None:
+        return None
+    import numpy as np
+
+    if not isinstance(data, (bytes, bytearray, memoryview)):
+        return np.asarray(data, dtype=np.float32)  # float8[] row not yet migrated
+    dtype = "<f2" if len(data) == DIMENSIONS * 2 else "<f4"
+    return np.frombuffer(data, dtype=dtype).astype(np.float32, copy=False)
+
+
+def _get_embed_executor() -> ThreadPoolExecutor:
+    global _embed_executor
+    if _embed_executor is None:
+        _embed_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed")
+    return _embed_executor
+
+
+def shutdown_embed_executor() -> None:
+    """Release the embedding worker (called on application shutdown)."""
+    global _embed_executor
+    if _embed_executor is not None:
+        _embed_executor.shutdown(wait=False, cancel_futures=True)
+        _embed_executor = None
+
+
+class EmbeddingBatcher:
+    """Collects concurrent embedding requests into batches for one encode call."""
+
+    def __init__(self, max_batch_size: int, window_seconds: float):
+        self.max_batch_size = max(1, max_batch_size)
+        self.window_seconds = window_seconds
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    async def embed(self, text: str) -> "np.ndarray":
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch = [(t, f) for t, f in self._pending if not f.cancelled()]
+        self._pending = []
+        if batch:
+            asyncio.get_running_loop().create_task(self._run(batch))
+
+    async def _run(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        self.batches += 1
+        self.items += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        loop = asyncio.get_running_loop()
+        try:
+            vectors = await loop.run_in_executor(
+                _get_embed_executor(), _encode_batch, [t for t, _ in batch]
+            )
+        except Exception as e:
+            logger.warning(f"[EMBED] Batch of {len(batch)} failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else None,
+            "largest_batch": self.largest_batch,
+            "queued": len(self._pending),
+        }
+
+
+# Singleton instance
+_batcher: EmbeddingBatcher | None = None
+
+
+def get_embedding_batcher() -> EmbeddingBatcher:
+    global _batcher
+    if _batcher is None:
+        _batcher = EmbeddingBatcher(
+            settings.EMBED_BATCH_MAX_SIZE, settings.EMBED_BATCH_WINDOW_MS / 1000
+        )
+    return _batcher
+
+
+async def generate_embedding(text: str) -> "np.ndarray":
+    """Generate embedding vector for text using local MiniLM model (micro-batched)."""
+    return await get_embedding_batcher().embed(text)
+
+
+async def generate_embeddings(texts: list[str]) -> list["np.ndarray"]:
+    """Embed several texts; they are queued together and share batches."""
+    return list(await asyncio.gather(*(generate_embedding(t) for t in texts)))
 
 
 async def check_duplicate(
-    embedding: list[float], threshold: float = 0.85
+    embedding: "np.ndarray | None",
+    threshold: float = 0.85,
+    window_hours: float | None = None,
+    index: VectorIndex | None = None,
 ) -> tuple[bool, str | None, float | None]:
-    """Check if embedding is similar to any stored embeddings."""
-    return False, None, None
+    """Check if embedding is similar to any stored embeddings.
+
+    Searches articles from the last `window_hours` (default DEDUP_WINDOW_HOURS)
+    in `index`, else in the DEDUP_BACKEND index, and returns
+    (is_duplicate, most similar article id, its cosine similarity).
+    """
+    if embedding is None:
+        return False, None, None
+    window = settings.DEDUP_WINDOW_HOURS if window_hours is None else window_hours
+    if index is None and settings.DEDUP_BACKEND == "pgvector":
+        from app.services import database as db
+
+        since = datetime.now(timezone.utc) - timedelta(hours=window)
+        matches = await db.find_similar_articles(embedding, k=1, since=since)
+    else:
+        index = index if index is not None else get_vector_index()
+        matches = index.search(embedding, k=1, window_hours=window)
+    if not matches:
+        return False, None, None
+    article_id, score = matches[0]
+    return score >= threshold, article_id, round(score, 4)
+
+
+async def warm_vector_index() -> None:
+    """Load embeddings of articles inside the dedup window into the vector index."""
+    if settings.DEDUP_BACKEND == "pgvector":
+        return  # nearest-neighbour queries go to Postgres instead
+    from app.services import database as db
+
+    since = datetime.now(timezone.utc) - timedelta(hours=settings.DEDUP_WINDOW_HOURS)
+    try:
+        rows = await db.get_recent_embeddings(settings.VECTOR_INDEX_MAX_ITEMS, since)
+    except Exception as e:
+        logger.warning(f"[EMBED] Could not warm vector index: {e}")
+        return
+    index = get_vector_index()
+    # Oldest first, so eviction order matches insertion order
+    added = sum(
+        index.add(str(row["id"]), unpack_embedding(row["embedding"]), row["created_at"])
+        for row in reversed(rows)
+    )
+    logger.info(f"[EMBED] Vector index warmed with {added} embeddings")
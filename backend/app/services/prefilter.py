@@ -0,0 +1,168 @@
+"""Local relevance prefilter run before Gemini scoring.
+
+Combines two cheap signals:
+- cosine similarity between the article's MiniLM embedding (already computed
+  for dedup) and a set of AI/ML topic centroids,
+- a weighted keyword model over title and content.
+
+PREFILTER_MODE controls what happens with the result:
+- "off": not evaluated,
+- "shadow": evaluated and compared with Gemini's relevance score (logged and
+  counted), but nothing is rejected,
+- "enforce": articles below PREFILTER_THRESHOLD skip Gemini entirely.
+"""
+
+import asyncio
+import logging
+import math
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+from app.core.config import settings
+from app.services.embeddings import generate_embeddings
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Short descriptions of what the account covers; their embeddings are the centroids
+TOPIC_DESCRIPTIONS = [
+    "Large language models, chatbots and generative AI products",
+    "Machine learning research papers, benchmarks and new model architectures",
+    "AI chips, GPUs, data centers and compute for training models",
+    "AI startups raising funding, acquisitions and AI company strategy",
+    "OpenAI, Google DeepMind, Anthropic, Meta AI and Microsoft AI announcements",
+    "Robotics, self-driving cars and autonomous systems",
+    "AI regulation, safety, copyright and policy debates",
+    "Open-source AI models, developer tools and AI coding assistants",
+    "Computer vision, speech recognition and image or video generation",
+]
+
+# Keyword model: pattern -> weight (title matches count double)
+KEYWORD_WEIGHTS = {
+    r"\bai\b": 1.0,
+    r"artificial intelligence": 1.5,
+    r"machine learning|deep learning|neural net": 1.5,
+    r"\bllms?\b|language models?": 1.5,
+    r"\bgpt|chatgpt|gemini|claude|llama|mistral|copilot": 1.5,
+    r"openai|anthropic|deepmind|hugging ?face|nvidia": 1.0,
+    r"generative|chatbot|transformer|diffusion|inference|training data": 1.0,
+    r"\brobot|autonomous|self-driving": 0.75,
+    r"\bgpus?\b|accelerator|data ?center": 0.5,
+    r"algorithm|model weights|open-source model|benchmark": 0.5,
+}
+_KEYWORD_PATTERNS = [(re.compile(p, re.IGNORECASE), w) for p, w in KEYWORD_WEIGHTS.items()]
+
+# Blend of the two signals in the final prefilter score
+TOPIC_WEIGHT = 0.7
+KEYWORD_WEIGHT = 0.3
+
+_centroids = None  # normalized float32 matrix, one row per topic (lazy)
+_centroids_lock: Optional[asyncio.Lock] = None
+
+# Shadow-mode confusion counts against Gemini (relevant = relevance >= TWEET_MIN_RELEVANCE)
+_counts = {"pass_relevant": 0, "pass_irrelevant": 0, "reject_relevant": 0, "reject_irrelevant": 0}
+_rejected = 0
+
+
+@dataclass
+class PrefilterResult:
+    """Prefilter verdict for one article."""
+    score: float
+    topic_similarity: float
+    keyword_score: float
+    passed: bool
+
+
+def keyword_score(title: str, content: str) -> float:
+    """Weighted keyword hits, squashed into 0..1."""
+    text = content[:3000]
+    total = 0.0
+    for pattern, weight in _KEYWORD_PATTERNS:
+        if pattern.search(title):
+            total += 2 * weight
+        elif pattern.search(text):
+            total += weight
+    return 1 - math.exp(-total / 2)
+
+
+async def _get_centroids():
+    """Topic centroids, embedded together in one batch by the first caller."""
+    global _centroids, _centroids_lock
+    if _centroids is None:
+        if _centroids_lock is None:
+            _centroids_lock = asyncio.Lock()
+        async with _centroids_lock:
+            if _centroids is None:
+                import numpy as np
+
+                vectors = await generate_embeddings(TOPIC_DESCRIPTIONS)
+                matrix = np.asarray(vectors, dtype=np.float32)
+                _centroids = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+    return _centroids
+
+
+async def evaluate(
+    title: str, content: str, embedding: Optional["np.ndarray"]
+) -> Optional[PrefilterResult]:
+    """Score an article locally; None when the prefilter is off or there is no embedding."""
+    if settings.PREFILTER_MODE == "off" or embedding is None:
+        return None
+    import numpy as np
+
+    centroids = await _get_centroids()
+    vector = np.asarray(embedding, dtype=np.float32)
+    vector = vector / (np.linalg.norm(vector) or 1.0)  # not in place: it is the caller's array
+    similarity = float(np.max(centroids @ vector))
+    keywords = keyword_score(title, content)
+    score = TOPIC_WEIGHT * similarity + KEYWORD_WEIGHT * keywords
+    return PrefilterResult(
+        score=round(score, 4),
+        topic_similarity=round(similarity, 4),
+        keyword_score=round(keywords, 4),
+        passed=score >= settings.PREFILTER_THRESHOLD,
+    )
+
+
+def should_reject(result: Optional[PrefilterResult]) -> bool:
+    """True if this article should skip Gemini (enforce mode and below threshold)."""
+    global _rejected
+    if result is None or result.passed or settings.PREFILTER_MODE != "enforce":
+        return False
+    _rejected += 1
+    return True
+
+
+def record_agreement(
+    result: Optional[PrefilterResult], title: str, relevance: Optional[int]
+) -> None:
+    """Compare a prefilter verdict with Gemini's relevance score (shadow mode)."""
+    if result is None or relevance is None:
+        return
+    relevant = relevance >= settings.TWEET_MIN_RELEVANCE
+    key = f"{'pass' if result.passed else 'reject'}_{'relevant' if relevant else 'irrelevant'}"
+    _counts[key] += 1
+    if key == "reject_relevant":
+        logger.warning(
+            f"[PREFILTER] Would have rejected relevant '{title[:60]}' "
+            f"(prefilter={result.score}, gemini={relevance})"
+        )
+    else:
+        logger.info(f"[PREFILTER] '{title[:60]}': prefilter={result.score}, gemini={relevance}")
+
+
+def stats() -> dict:
+    compared = sum(_counts.values())
+    agreed = _counts["pass_relevant"] + _counts["reject_irrelevant"]
+    would_reject = _counts["reject_relevant"] + _counts["reject_irrelevant"]
+    return {
+        "mode": settings.PREFILTER_MODE,
+        "threshold": settings.PREFILTER_THRESHOLD,
+        "rejected": _rejected,
+        "compared": compared,
+        "agreement": round(agreed / compared, 3) if compared else None,
+        "would_reject_rate": round(would_reject / compared, 3) if compared else None,
+        **_counts,
+    }
@@ -0,0 +1,131 @@
+"""Article text preparation for Gemini prompts.
+
+Feed content is often raw HTML (entry.content[0]) padded with feed boilerplate
+("The post ... appeared first on ...", share/subscribe lines). build_content
+strips the markup, drops boilerplate and repeated paragraphs, and fits what is
+left into a per-call-type token budget, keeping whole paragraphs from the top
+so the lede always survives.
+"""
+
+import html
+import re
+from html.parser import HTMLParser
+
+from app.core.config import settings
+
+# Rough Gemini tokenizer ratio for English prose
+CHARS_PER_TOKEN = 4
+
+# Elements whose text never belongs in a prompt
+SKIP_TAGS = {"script", "style", "noscript", "iframe", "svg", "form", "nav", "footer", "figure"}
+BLOCK_TAGS = {
+    "p", "div", "br", "li", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6",
+    "blockquote", "pre", "table", "tr", "section", "article", "header",
+}
+
+BOILERPLATE_PATTERNS = [
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"^the post .+ appeared first on .+$",
+        r"^(continue|keep) reading",
+        r"^read (more|the full|the rest)",
+        r"^(click|tap) here",
+        r"^(subscribe|sign up|join) (to|for|now|our)",
+        r"^(share|follow us) (this|on)",
+        r"^(advertisement|sponsored)$",
+        r"all rights reserved",
+        r"^image( credit)?s?:",
+        r"^(photo|credit):",
+    )
+]
+
+# Content token budget per call type (batch is per article in the batch)
+_BUDGET_SETTINGS = {
+    "score": "PROMPT_SCORE_CONTENT_TOKENS",
+    "score_batch": "PROMPT_BATCH_CONTENT_TOKENS",
+    "score_and_tweet": "PROMPT_TWEET_CONTENT_TOKENS",
+    "tweet": "PROMPT_TWEET_CONTENT_TOKENS",
+}
+
+
+class _TextExtractor(HTMLParser):
+    """Collects visible text, turning block elements into paragraph breaks."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: list[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def strip_html(text: str) -> str:
+    """Visible text of an HTML fragment, one paragraph per line."""
+    if "<" not in text:
+        return html.unescape(text)
+    parser = _TextExtractor()
+    try:
+        parser.feed(text)
+        parser.close()
+    except Exception:
+        return re.sub(r"<[^>]+>", " ", html.unescape(text))
+    return "".join(parser.parts)
+
+
+def clean_paragraphs(text: str) -> list[str]:
+    """Strip markup, then drop empty, boilerplate and repeated paragraphs."""
+    seen = set()
+    paragraphs = []
+    for line in strip_html(text).split("\n"):
+        line = re.sub(r"\s+", " ", line).strip()
+        if not line or any(p.search(line) for p in BOILERPLATE_PATTERNS):
+            continue
+        key = line.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        paragraphs.append(line)
+    return paragraphs
+
+
+def fit_to_budget(paragraphs: list[str], max_tokens: int) -> str:
+    """Whole paragraphs from the top while they fit; the next one is cut at a sentence end."""
+    budget = max_tokens * CHARS_PER_TOKEN
+    kept = []
+    used = 0
+    for paragraph in paragraphs:
+        if used + len(paragraph) <= budget:
+            kept.append(paragraph)
+            used += len(paragraph) + 1
+            continue
+        room = budget - used
+        if room > 80:
+            cut = paragraph[:room]
+            end = max(cut.rfind(". "), cut.rfind("! "), cut.rfind("? "))
+            kept.append(cut[: end + 1] if end > room // 2 else cut.rsplit(" ", 1)[0] + " ...")
+        break
+    return "\n".join(kept)
+
+
+def build_content(content: str, kind: str) -> str:
+    """Cleaned article text sized to the token budget of call type `kind`."""
+    max_tokens = getattr(settings, _BUDGET_SETTINGS.get(kind, "PROMPT_SCORE_CONTENT_TOKENS"))
+    return fit_to_budget(clean_paragraphs(content), max_tokens)
@@ -4,13 +4,21 @@ Fetches articles from configured tech news RSS feeds using httpx + feedparser.
 """
 
 import asyncio
+import hashlib
+import json
 import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 
 import feedparser
 import httpx
 
+from app.core.config import settings
 from app.models import ArticleInput
+from app.services import database as db
+from app.services.urls import canonicalize_url
 
 logger = logging.getLogger(__name__)
 
@@ -29,79 +37,343 @@ RSS_FEEDS = [
 # Max articles per feed to avoid overwhelming Gemini
 MAX_PER_FEED = 5
 
+# Pool for feedparser work (lazy, see _get_parse_executor)
+_parse_executor: Executor | None = None
 
-async def fetch_single_feed(
-    client: httpx.AsyncClient, feed: dict
-) -> list[ArticleInput]:
+# Per-feed HTTP validators and body hash, keyed by feed URL (lazy-loaded)
+_feed_cache: dict[str, dict] | None = None
+
+
+def _get_feed_cache() -> dict[str, dict]:
+    """Load the conditional-GET cache from disk on first use."""
+    global _feed_cache
+    if _feed_cache is None:
+        _feed_cache = {}
+        try:
+            with open(settings.RSS_CACHE_PATH, encoding="utf-8") as f:
+                _feed_cache = json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"[RSS] Ignoring unreadable feed cache: {e}")
+    return _feed_cache
+
+
+def _save_feed_cache() -> None:
+    """Persist the conditional-GET cache so it survives restarts."""
+    if _feed_cache is None:
+        return
+    tmp_path = f"{settings.RSS_CACHE_PATH}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(_feed_cache, f)
+        os.replace(tmp_path, settings.RSS_CACHE_PATH)
+    except Exception as e:
+        logger.warning(f"[RSS] Could not save feed cache: {e}")
+
+
+# Article content is stored and fingerprinted up to this many characters
+MAX_CONTENT_CHARS = 5000
+
+
+def content_digest(content: str) -> str:
+    """MD5 of the stored content prefix; matches md5(left(content, 5000)) in SQL."""
+    return hashlib.md5(content[:MAX_CONTENT_CHARS].encode("utf-8")).hexdigest()
+
+
+def _published_key(published_at: datetime | None) -> str:
+    """UTC timestamp to the second, for aware feed dates and naive DB columns alike."""
+    if published_at is None:
+        return ""
+    if published_at.tzinfo is not None:
+        published_at = published_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return published_at.isoformat(timespec="seconds")
+
+
+class SeenEntryIndex:
+    """Fingerprints of feed entries that are already ingested.
+
+    Each entry is keyed by its GUID, its canonical URL and a hash of the whole
+    entry (source, title, link, published date and content); a match on any
+    key means the entry is known. A recurring title ("This Week in AI") alone
+    never matches. Keys are stored as 8-byte BLAKE2 digests so the set stays
+    small even with a large article history.
+    """
+
+    def __init__(self):
+        self._keys: set[bytes] = set()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @staticmethod
+    def _keys_for(
+        source: str,
+        title: str,
+        link: str,
+        guid: str | None,
+        published_at: datetime | None,
+        digest: str,
+    ) -> list[bytes]:
+        raw = [
+            f"u:{canonicalize_url(link)}",
+            f"h:{source}\n{title.strip()}\n{link}\n{_published_key(published_at)}\n{digest}",
+        ]
+        if guid:
+            raw.append(f"g:{guid}")
+        return [hashlib.blake2b(k.encode("utf-8"), digest_size=8).digest() for k in raw]
+
+    def contains(
+        self,
+        source: str,
+        title: str,
+        link: str,
+        guid: str | None = None,
+        published_at: datetime | None = None,
+        digest: str = "",
+    ) -> bool:
+        keys = self._keys_for(source, title, link, guid, published_at, digest)
+        return any(k in self._keys for k in keys)
+
+    def add(
+        self,
+        source: str,
+        title: str,
+        link: str,
+        guid: str | None = None,
+        published_at: datetime | None = None,
+        digest: str = "",
+    ) -> None:
+        self._keys.update(self._keys_for(source, title, link, guid, published_at, digest))
+
+    def add_article(self, article: ArticleInput) -> None:
+        self.add(
+            article.source, article.title, article.url, article.guid,
+            article.published_at, content_digest(article.content),
+        )
+
+
+_seen_index = SeenEntryIndex()
+
+
+def get_seen_index() -> SeenEntryIndex:
+    return _seen_index
+
+
+async def warm_seen_index() -> None:
+    """Load fingerprints for stored articles so known entries are skipped after restart.
+
+    Only the canonical link and entry hash are warmed: GUIDs are not stored,
+    so GUID matches cover entries seen since this process started.
+    """
+    try:
+        rows = await db.get_article_keys(settings.SEEN_INDEX_WARM_LIMIT)
+    except Exception as e:
+        logger.warning(f"[RSS] Could not warm seen-entry index: {e}")
+        return
+    for row in rows:
+        _seen_index.add(
+            row["source"], row["title"], row["url"],
+            published_at=row["published_at"], digest=row["content_md5"],
+        )
+    logger.info(f"[RSS] Seen-entry index warmed with {len(rows)} articles")
+
+
+def parse_feed_entries(text: str, limit: int) -> tuple[int, list[dict]]:
+    """Parse feed XML into plain entry dicts (runs in a worker, must stay picklable).
+
+    Returns the total entry count and the first `limit` usable entries.
+    """
+    parsed = feedparser.parse(text)
+    entries = []
+
+    for entry in parsed.entries[:limit]:
+        title = entry.get("title", "").strip()
+        link = entry.get("link", "").strip()
+        # Try different content fields
+        content = ""
+        if entry.get("content"):
+            content = entry.content[0].get("value", "")
+        elif entry.get("summary"):
+            content = entry.get("summary", "")
+        elif entry.get("description"):
+            content = entry.get("description", "")
+
+        if not title or not link:
+            continue
+
+        # Parse published date
+        published_at = None
+        if entry.get("published_parsed"):
+            try:
+                published_at = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
+            except Exception:
+                pass
+
+        entries.append({
+            "guid": entry.get("id"),
+            "title": title,
+            "link": link,
+            "content": content,
+            "published_at": published_at,
+        })
+
+    return len(parsed.entries), entries
+
+
+def _get_parse_executor() -> Executor:
+    """Get or create the pool that runs feedparser off the event loop."""
+    global _parse_executor
+    if _parse_executor is None:
+        workers = max(1, settings.RSS_PARSE_WORKERS)
+        if settings.RSS_PARSE_EXECUTOR == "process":
+            _parse_executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            _parse_executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="rss-parse"
+            )
+    return _parse_executor
+
+
+def shutdown_parse_executor() -> None:
+    """Release parser workers (called on application shutdown)."""
+    global _parse_executor
+    if _parse_executor is not None:
+        _parse_executor.shutdown(wait=False, cancel_futures=True)
+        _parse_executor = None
+
+
+async def _parse_off_loop(text: str, limit: int) -> tuple[int, list[dict]]:
+    """Run parse_feed_entries in the parser pool so large feeds don't block the loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_parse_executor(), parse_feed_entries, text, limit)
+
+
+@dataclass
+class FeedFetch:
+    """Result of polling one feed.
+
+    status is "ok", "not_modified" (304 or unchanged body) or "error".
+    `published` holds the timestamps of every parsed entry, including ones
+    already seen, so the scheduler can learn from them; `articles` holds only
+    the fresh entries.
+    """
+    status: str
+    articles: list[ArticleInput] = field(default_factory=list)
+    published: list[datetime] = field(default_factory=list)
+    entries: int = 0
+
+
+async def fetch_single_feed(client: httpx.AsyncClient, feed: dict) -> FeedFetch:
     """Fetch and parse a single RSS feed."""
     name = feed["name"]
     url = feed["url"]
     articles = []
 
+    cache = _get_feed_cache()
+    cached = cache.get(url, {})
+    headers = {}
+    if cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+
     try:
-        response = await client.get(url, follow_redirects=True)
+        response = await client.get(url, headers=headers, follow_redirects=True)
+        if response.status_code == 304:
+            logger.info(f"[RSS] {name}: not modified")
+            return FeedFetch("not_modified")
         response.raise_for_status()
 
-        parsed = feedparser.parse(response.text)
-        entries = parsed.entries[:MAX_PER_FEED]
-
-        logger.info(f"[RSS] {name}: {len(parsed.entries)} entries, taking {len(entries)}")
-
-        for entry in entries:
-            title = entry.get("title", "").strip()
-            link = entry.get("link", "").strip()
-            # Try different content fields
-            content = ""
-            if entry.get("content"):
-                content = entry.content[0].get("value", "")
-            elif entry.get("summary"):
-                content = entry.get("summary", "")
-            elif entry.get("description"):
-                content = entry.get("description", "")
-
-            if not title or not link:
-                continue
-
-            # Parse published date
-            published_at = None
-            if entry.get("published_parsed"):
-                try:
-                    published_at = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
-                except Exception:
-                    pass
+        validators = {
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "hash": hashlib.sha256(response.content).hexdigest(),
+        }
+        if validators["hash"] == cached.get("hash"):
+            cache[url] = validators
+            logger.info(f"[RSS] {name}: body unchanged")
+            return FeedFetch("not_modified")
+
+        total, entries = await _parse_off_loop(
+            response.text, feed.get("max_entries", MAX_PER_FEED)
+        )
+
+        # Content as it will be stored (and fingerprinted)
+        for e in entries:
+            e["content"] = e["content"][:MAX_CONTENT_CHARS] if e["content"] else e["title"]
+
+        # Discard already-ingested entries before any DB or model work
+        fresh = [
+            e for e in entries
+            if not _seen_index.contains(
+                name, e["title"], e["link"], e["guid"],
+                e["published_at"], content_digest(e["content"]),
+            )
+        ]
+
+        logger.info(
+            f"[RSS] {name}: {total} entries, taking {len(entries)}, "
+            f"{len(entries) - len(fresh)} already seen"
+        )
 
+        for entry in fresh:
             articles.append(
                 ArticleInput(
-                    title=title,
-                    url=link,
-                    content=content[:5000] if content else title,
+                    title=entry["title"],
+                    url=entry["link"],
+                    content=entry["content"],
                     source=name,
-                    published_at=published_at,
+                    published_at=entry["published_at"],
+                    guid=entry["guid"],
                 )
             )
 
+        # Only remember the body once it has been parsed successfully
+        cache[url] = validators
+
     except httpx.HTTPStatusError as e:
         logger.warning(f"[RSS] {name}: HTTP error {e.response.status_code}")
+        return FeedFetch("error")
     except httpx.RequestError as e:
         logger.warning(f"[RSS] {name}: Request error: {e}")
+        return FeedFetch("error")
     except Exception as e:
         logger.warning(f"[RSS] {name}: Unexpected error: {e}")
+        return FeedFetch("error")
 
-    return articles
+    return FeedFetch(
+        "ok",
+        articles=articles,
+        published=[e["published_at"] for e in entries if e["published_at"]],
+        entries=len(entries),
+    )
 
 
-async def fetch_all_feeds() -> list[ArticleInput]:
-    """Fetch articles from all configured RSS feeds concurrently."""
+async def fetch_feeds(feeds: list[dict]) -> dict[str, FeedFetch]:
+    """Fetch the given feeds concurrently, returning results keyed by feed URL.
+
+    A feed dict may carry "max_entries" to override MAX_PER_FEED.
+    """
     async with httpx.AsyncClient(timeout=15.0) as client:
-        tasks = [fetch_single_feed(client, feed) for feed in RSS_FEEDS]
+        tasks = [fetch_single_feed(client, feed) for feed in feeds]
         results = await asyncio.gather(*tasks, return_exceptions=True)
+    _save_feed_cache()
 
-    all_articles = []
-    for i, result in enumerate(results):
+    by_feed = {}
+    for feed, result in zip(feeds, results):
         if isinstance(result, Exception):
-            logger.warning(f"[RSS] {RSS_FEEDS[i]['name']}: Failed: {result}")
+            logger.warning(f"[RSS] {feed['name']}: Failed: {result}")
+            by_feed[feed["url"]] = FeedFetch("error")
         else:
-            all_articles.extend(result)
+            by_feed[feed["url"]] = result
+    return by_feed
+
+
+async def fetch_all_feeds() -> list[ArticleInput]:
+    """Fetch articles from all configured RSS feeds concurrently."""
+    by_feed = await fetch_feeds(RSS_FEEDS)
+    all_articles = [a for result in by_feed.values() for a in result.articles]
 
     logger.info(f"[RSS] Total articles fetched: {len(all_articles)} from {len(RSS_FEEDS)} feeds")
     return all_articles
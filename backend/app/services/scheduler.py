@@ -0,0 +1,204 @@
+"""Adaptive per-feed polling scheduler.
+
+Learns each feed's publish rate (entries/hour) from entry timestamps on the
+first poll and from the number of new entries seen on later polls, then polls
+busy feeds often and quiet feeds rarely. Each feed gets its own jittered
+interval and an entry cap sized to what it is expected to publish in between.
+"""
+
+import asyncio
+import logging
+import math
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+from app.core.config import settings
+from app.models import ArticleInput
+from app.services import rss
+
+logger = logging.getLogger(__name__)
+
+# Aim for this many new entries per poll when choosing an interval
+TARGET_NEW_PER_POLL = 2.0
+# Weight of the newest observation in the publish-rate moving average
+RATE_ALPHA = 0.3
+# Bounds for the per-feed entry cap
+MIN_ENTRIES = 2
+MAX_ENTRIES = 20
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass
+class FeedState:
+    """Learned polling state for one feed."""
+    name: str
+    url: str
+    rate_per_hour: Optional[float] = None
+    interval_minutes: float = 30.0
+    max_entries: int = rss.MAX_PER_FEED
+    polls: int = 0
+    errors: int = 0
+    last_polled: Optional[datetime] = None
+    last_seen_published: Optional[datetime] = None
+    next_due: datetime = field(default_factory=_utcnow)
+
+
+class FeedScheduler:
+    """Polls each RSS feed on its own learned interval and hands new articles on."""
+
+    def __init__(self, feeds: list[dict]):
+        self._states = {f["url"]: FeedState(name=f["name"], url=f["url"]) for f in feeds}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def observe(self, state: FeedState, result: rss.FeedFetch, now: datetime) -> None:
+        """Update a feed's rate, interval, entry cap and next due time after a poll.
+
+        A failed fetch says nothing about the publish rate: the feed is retried
+        on its current interval and the next good poll covers the gap.
+        """
+        jitter = settings.FEED_POLL_JITTER
+        if result.status == "error":
+            state.errors += 1
+            delay = state.interval_minutes * random.uniform(1 - jitter, 1 + jitter)
+            state.next_due = now + timedelta(minutes=delay)
+            return
+
+        # Timestamps of all parsed entries, not only the unseen ones
+        published = sorted(result.published)
+        if state.last_seen_published:
+            new_count = sum(1 for p in published if p > state.last_seen_published)
+            # Every returned entry was new: the cap may be hiding more
+            saturated = result.entries >= state.max_entries and new_count >= result.entries
+        else:
+            new_count = len(published)
+            saturated = False
+
+        observed = None
+        if state.last_polled is None:
+            # First poll: estimate from the spread of entry timestamps
+            if len(published) >= 2:
+                span_hours = (published[-1] - published[0]).total_seconds() / 3600
+                observed = (len(published) - 1) / max(span_hours, 1 / 60)
+        else:
+            elapsed_hours = (now - state.last_polled).total_seconds() / 3600
+            observed = new_count / max(elapsed_hours, 1 / 60)
+
+        if observed is not None:
+            if state.rate_per_hour is None:
+                state.rate_per_hour = observed
+            else:
+                state.rate_per_hour = (
+                    RATE_ALPHA * observed + (1 - RATE_ALPHA) * state.rate_per_hour
+                )
+
+        min_minutes = settings.FEED_POLL_MIN_MINUTES
+        max_minutes = settings.FEED_POLL_MAX_MINUTES
+        if state.rate_per_hour:
+            interval = 60 * TARGET_NEW_PER_POLL / state.rate_per_hour
+            state.interval_minutes = min(max(interval, min_minutes), max_minutes)
+            expected = state.rate_per_hour * state.interval_minutes / 60
+            state.max_entries = min(max(math.ceil(expected * 1.5), MIN_ENTRIES), MAX_ENTRIES)
+        elif state.rate_per_hour == 0:
+            state.interval_minutes = max_minutes
+            state.max_entries = MIN_ENTRIES
+
+        if saturated:
+            state.max_entries = min(state.max_entries * 2, MAX_ENTRIES)
+
+        delay = state.interval_minutes * random.uniform(1 - jitter, 1 + jitter)
+        state.next_due = now + timedelta(minutes=delay)
+        state.last_polled = now
+        state.polls += 1
+        if published:
+            latest = published[-1]
+            if state.last_seen_published is None or latest > state.last_seen_published:
+                state.last_seen_published = latest
+
+    async def poll_due(self, now: Optional[datetime] = None) -> list[ArticleInput]:
+        """Poll every feed whose next_due has passed and return their articles."""
+        now = now or _utcnow()
+        due = [s for s in self._states.values() if s.next_due <= now]
+        if not due:
+            return []
+
+        by_feed = await rss.fetch_feeds(
+            [{"name": s.name, "url": s.url, "max_entries": s.max_entries} for s in due]
+        )
+        articles = []
+        for state in due:
+            result = by_feed.get(state.url) or rss.FeedFetch("error")
+            self.observe(state, result, now)
+            articles.extend(result.articles)
+            logger.info(
+                f"[SCHED] {state.name}: {result.status}, {len(result.articles)} new entries, "
+                f"rate={state.rate_per_hour or 0:.2f}/h, "
+                f"next in {state.interval_minutes:.0f}m, cap={state.max_entries}"
+            )
+        return articles
+
+    async def run(self, on_articles: Callable[[list[ArticleInput]], Awaitable]) -> None:
+        """Poll due feeds forever, passing their articles to on_articles."""
+        while True:
+            try:
+                articles = await self.poll_due()
+                if articles:
+                    await on_articles(articles)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[SCHED] Poll failed: {e}")
+
+            next_due = min(s.next_due for s in self._states.values())
+            await asyncio.sleep(max((next_due - _utcnow()).total_seconds(), 1.0))
+
+    def start(self, on_articles: Callable[[list[ArticleInput]], Awaitable]) -> None:
+        """Start the polling loop as a background task."""
+        if not self.running:
+            self._task = asyncio.create_task(self.run(on_articles))
+
+    async def stop(self) -> None:
+        """Cancel the polling loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> list[dict]:
+        """Current learned state of every feed, for the status endpoint."""
+        return [
+            {
+                "name": s.name,
+                "url": s.url,
+                "rate_per_hour": round(s.rate_per_hour, 3) if s.rate_per_hour is not None else None,
+                "interval_minutes": round(s.interval_minutes, 1),
+                "max_entries": s.max_entries,
+                "polls": s.polls,
+                "errors": s.errors,
+                "last_polled": s.last_polled.isoformat() if s.last_polled else None,
+                "next_due": s.next_due.isoformat(),
+            }
+            for s in self._states.values()
+        ]
+
+
+# Singleton instance
+_feed_scheduler: Optional[FeedScheduler] = None
+
+
+def get_feed_scheduler() -> FeedScheduler:
+    global _feed_scheduler
+    if _feed_scheduler is None:
+        _feed_scheduler = FeedScheduler(rss.RSS_FEEDS)
+    return _feed_scheduler
@@ -0,0 +1,92 @@
+"""Canonical URL normalization for article dedup.
+
+The same story often arrives under several URLs that differ only in tracking
+parameters, www/AMP variants, trailing slashes or a redirect wrapper added by
+the feed. canonicalize_url maps all of those to one key, which is stored in
+articles.canonical_url (unique) and used for every URL-based dedup lookup.
+"""
+
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track the click, never select content
+TRACKING_PARAMS = {
+    "ref", "ref_src", "ref_url", "referrer",
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "twclid", "igshid",
+    "mc_cid", "mc_eid", "cmpid", "ncid", "taid", "guccounter", "guce_referrer",
+    "guce_referrer_sig", "_hsenc", "_hsmi", "mkt_tok", "oly_enc_id", "oly_anon_id",
+    "vero_id", "wt_mc", "smid", "sr_share", "amp", "outputtype",
+}
+TRACKING_PREFIXES = ("utm_", "__twitter", "at_")
+
+# Redirect wrappers: query parameters that carry the real target, and wrapper paths
+REDIRECT_PARAMS = ("url", "u", "q", "target", "dest", "destination", "redirect", "to")
+REDIRECT_PATHS = ("/url", "/l.php", "/redirect", "/out", "/link", "/click", "/r")
+
+
+def _unwrap_redirect(parts) -> str | None:
+    """Return the wrapped target URL if this looks like a redirect link."""
+    path = parts.path.rstrip("/").lower()
+    if not (path in REDIRECT_PATHS or path.endswith(REDIRECT_PATHS)):
+        return None
+    for key, value in parse_qsl(parts.query, keep_blank_values=True):
+        if key.lower() in REDIRECT_PARAMS:
+            target = unquote(value)
+            if target.startswith(("http://", "https://")):
+                return target
+    return None
+
+
+def _strip_amp(host: str, path: str) -> tuple[str, str]:
+    """Remove AMP host prefixes and path segments."""
+    # Google AMP cache: <host>.cdn.ampproject.org/c/s/<origin host>/<path>
+    if host.endswith(".cdn.ampproject.org"):
+        segments = path.lstrip("/").split("/")
+        while segments and segments[0] in ("c", "v", "s", "i"):
+            segments.pop(0)
+        if segments:
+            host, path = segments[0], "/" + "/".join(segments[1:])
+    if host.startswith("amp."):
+        host = host[4:]
+    segments = [s for s in path.split("/") if s]
+    if segments and segments[-1] in ("amp", "amp.html"):
+        segments.pop()
+    if segments and segments[0] == "amp":
+        segments.pop(0)
+    path = "/" + "/".join(segments)
+    if path.endswith(".amp.html"):
+        path = path[: -len(".amp.html")] + ".html"
+    return host, path
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL so variants of the same article share one key.
+
+    Unwraps redirect links, forces https, drops www./AMP variants, fragments,
+    tracking parameters and trailing slashes, and sorts the remaining query.
+    """
+    url = url.strip()
+    parts = urlsplit(url)
+    for _ in range(3):
+        target = _unwrap_redirect(parts)
+        if target is None:
+            break
+        parts = urlsplit(target)
+
+    if not parts.netloc:
+        return url
+
+    host = parts.hostname or ""
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    host, path = _strip_amp(host, parts.path or "/")
+    path = path.rstrip("/") or "/"
+
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    )
+
+    return urlunsplit(("https", host, path, urlencode(query), ""))
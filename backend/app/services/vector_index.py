@@ -0,0 +1,136 @@
+"""In-process vector index for semantic dedup.
+
+Embeddings are L2-normalized and kept in one contiguous float32 NumPy matrix
+(grown by doubling), with the article id and a timestamp per row, so a
+lookup is a single matrix-vector product plus a time-window mask. The index
+is warmed from articles.embedding at startup and appended on save_article.
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.core.config import settings
+
+# all-MiniLM-L6-v2 output size
+DIMENSIONS = 384
+INITIAL_CAPACITY = 1024
+
+
+def _epoch(moment: Optional[datetime]) -> float:
+    """Seconds since epoch; naive datetimes are UTC (matches the DB columns)."""
+    if moment is None:
+        return time.time()
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+class VectorIndex:
+    """Normalized float32 embedding matrix with vectorized top-k cosine search."""
+
+    def __init__(self, dimensions: int = DIMENSIONS, max_items: int = 0):
+        import numpy as np
+
+        self.dimensions = dimensions
+        self.max_items = max_items  # 0 = unbounded; otherwise oldest rows are dropped
+        self._matrix = np.zeros((INITIAL_CAPACITY, dimensions), dtype=np.float32)
+        self._times = np.zeros(INITIAL_CAPACITY, dtype=np.float64)
+        self._ids: list[str] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _normalize(self, embedding):
+        import numpy as np
+
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        if vector.shape[0] != self.dimensions:
+            return None
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else None
+
+    def add(self, article_id: str, embedding, created_at: Optional[datetime] = None) -> bool:
+        """Append one article's embedding; returns False if it was unusable."""
+        import numpy as np
+
+        vector = self._normalize(embedding)
+        if vector is None:
+            return False
+        with self._lock:
+            size = len(self._ids)
+            if size == self._matrix.shape[0]:
+                capacity = size * 2
+                matrix = np.zeros((capacity, self.dimensions), dtype=np.float32)
+                matrix[:size] = self._matrix[:size]
+                times = np.zeros(capacity, dtype=np.float64)
+                times[:size] = self._times[:size]
+                self._matrix, self._times = matrix, times
+            self._matrix[size] = vector
+            self._times[size] = _epoch(created_at)
+            self._ids.append(str(article_id))
+            if self.max_items and len(self._ids) > self.max_items:
+                self._drop_oldest(len(self._ids) - self.max_items)
+        return True
+
+    def _drop_oldest(self, count: int) -> None:
+        import numpy as np
+
+        size = len(self._ids)
+        keep = np.argsort(self._times[:size], kind="stable")[count:]
+        keep.sort()
+        self._matrix[: len(keep)] = self._matrix[keep]
+        self._times[: len(keep)] = self._times[keep]
+        self._ids = [self._ids[i] for i in keep]
+
+    def search(
+        self,
+        embedding,
+        k: int = 5,
+        threshold: float = 0.0,
+        window_hours: Optional[float] = None,
+    ) -> list[tuple[str, float]]:
+        """Top-k (article_id, cosine similarity) at or above threshold, best first.
+
+        With window_hours, only articles added within that many hours count.
+        """
+        import numpy as np
+
+        query = self._normalize(embedding)
+        if query is None:
+            return []
+        with self._lock:
+            size = len(self._ids)
+            if size == 0:
+                return []
+            scores = self._matrix[:size] @ query
+            if window_hours is not None:
+                cutoff = time.time() - window_hours * 3600
+                scores = np.where(self._times[:size] >= cutoff, scores, -1.0)
+            k = min(k, size)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [
+                (self._ids[i], float(scores[i])) for i in top if scores[i] >= threshold
+            ]
+
+    def stats(self) -> dict:
+        return {
+            "items": len(self._ids),
+            "capacity": int(self._matrix.shape[0]),
+            "memory_mb": round(self._matrix.nbytes / 2**20, 2),
+            "max_items": self.max_items,
+        }
+
+
+# Singleton instance
+_vector_index: Optional[VectorIndex] = None
+
+
+def get_vector_index() -> VectorIndex:
+    global _vector_index
+    if _vector_index is None:
+        _vector_index = VectorIndex(max_items=settings.VECTOR_INDEX_MAX_ITEMS)
+    return _vector_index
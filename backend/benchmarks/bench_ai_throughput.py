@@ -0,0 +1,127 @@
+"""Benchmark Gemini-call throughput of the ingest scoring path against the fake server.
+
+Starts benchmarks.fake_gemini in a background thread (or uses --base-url),
+points the client at it and pushes synthetic articles through the same
+calls as POST /api/fetch: batch or single scoring, then a tweet for each
+relevant article. Reports wall time, articles/s, limiter behaviour (AIMD
+limit, retries, 429s) and per-kind latency.
+
+Run from backend/:
+    python -m benchmarks.bench_ai_throughput
+    python -m benchmarks.bench_ai_throughput --articles 500 --mode single --throttle-rate 0.05
+    python -m benchmarks.bench_ai_throughput --latency lognormal:1.0,0.6 --tail 0.02:20 --hedge
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+
+from app.core.config import settings
+from benchmarks.fake_gemini import FakeConfig, create_app
+
+
+def start_fake_server(config: FakeConfig, port: int) -> None:
+    import uvicorn
+
+    server = uvicorn.Server(
+        uvicorn.Config(create_app(config), host="127.0.0.1", port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+
+def synthetic_articles(count: int) -> dict[str, tuple[str, str]]:
+    return {
+        str(i): (
+            f"Synthetic article {i}: new model release",
+            f"<p>Paragraph about benchmark results number {i}.</p>" * 20,
+        )
+        for i in range(count)
+    }
+
+
+async def run(articles: dict[str, tuple[str, str]], mode: str) -> dict:
+    from app.services import ai
+
+    start = time.perf_counter()
+    if mode == "batch":
+        scores = await ai.score_articles(articles)
+    else:
+        results = await asyncio.gather(
+            *(ai.score_article(t, c) for t, c in articles.values()), return_exceptions=True
+        )
+        scores = {
+            k: r for k, r in zip(articles, results) if not isinstance(r, Exception) and r
+        }
+    scored = time.perf_counter()
+
+    relevant = [k for k, s in scores.items() if s.relevance >= settings.TWEET_MIN_RELEVANCE]
+    tweets = await asyncio.gather(
+        *(ai.generate_tweet(*articles[k]) for k in relevant), return_exceptions=True
+    )
+    done = time.perf_counter()
+
+    return {
+        "articles": len(articles),
+        "scored": len(scores),
+        "tweets": sum(1 for t in tweets if not isinstance(t, Exception) and t),
+        "score_seconds": round(scored - start, 2),
+        "total_seconds": round(done - start, 2),
+        "articles_per_second": round(len(articles) / (done - start), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--articles", type=int, default=200)
+    parser.add_argument("--mode", choices=["batch", "single"], default="batch")
+    parser.add_argument("--base-url", default="", help="use an already running fake server")
+    parser.add_argument("--port", type=int, default=8091)
+    parser.add_argument("--latency", default="lognormal:0.6,0.4")
+    parser.add_argument("--tail", default="")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--rpm", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=settings.MAX_CONCURRENT_AI_CALLS)
+    parser.add_argument("--hedge", action="store_true", help="enable hedged requests")
+    args = parser.parse_args()
+
+    fake = FakeConfig(
+        latency=args.latency,
+        tail=args.tail,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        rpm=args.rpm,
+        retry_delay=0.5,
+    )
+    if not args.base_url:
+        start_fake_server(fake, args.port)
+    settings.GEMINI_BASE_URL = args.base_url or f"http://127.0.0.1:{args.port}"
+    settings.AI_CACHE_ENABLED = False
+    settings.MAX_CONCURRENT_AI_CALLS = args.concurrency
+    settings.AI_HEDGE_ENABLED = args.hedge
+
+    result = asyncio.run(run(synthetic_articles(args.articles), args.mode))
+
+    from app.services.ai import get_limiter
+    from app.services.ai_latency import latency_stats
+
+    limiter = get_limiter().stats()
+    latency = {
+        kind: {k: v for k, v in stats.items() if k != "buckets"}
+        for kind, stats in latency_stats().items()
+    }
+    print(f"mode={args.mode} latency={args.latency} concurrency={args.concurrency}")
+    print(json.dumps({
+        "result": result,
+        "limiter": {k: limiter[k] for k in ("concurrency_limit", "retries", "throttled")},
+        "latency": latency,
+        "server": fake.stats if not args.base_url else "external",
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""Benchmark dedup nearest-neighbour search: pgvector HNSW vs exact search.
+
+Loads synthetic clustered 384-dim embeddings into a scratch table
+(dedup_bench_vectors, dropped afterwards) with the same HNSW index as
+migrations/002_pgvector.sql, growing it through --sizes. At each size it
+runs near-duplicate queries through
+  - exact in memory (VectorIndex, the DEDUP_BACKEND=memory path),
+  - exact in SQL (index scans disabled, full sort),
+  - HNSW in SQL at each --ef-search,
+and reports recall@1 / recall@k against the exact answer, the share of
+exact duplicates (top-1 >= --threshold) the ANN answer still catches, and
+p50/p95 latency.
+
+Needs a Postgres with the vector extension (DATABASE_URL or --dsn).
+Run from backend/:
+    python -m benchmarks.bench_dedup_ann
+    python -m benchmarks.bench_dedup_ann --sizes 10000,100000,300000 --ef-search 40,100
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.database import _get_dsn, _vector_literal
+from app.services.vector_index import DIMENSIONS, VectorIndex
+
+TABLE = "dedup_bench_vectors"
+CHUNK = 5000
+
+
+def synthetic_vectors(rng: np.random.Generator, count: int, spread: float) -> np.ndarray:
+    """Unit vectors in clusters of ~20, like coverage of the same topics across sources."""
+    centers = rng.normal(size=(max(1, count // 20), DIMENSIONS)).astype(np.float32)
+    vectors = centers[rng.integers(0, len(centers), count)]
+    vectors = vectors + spread * rng.normal(size=(count, DIMENSIONS)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _percentiles(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 2),
+        "p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))] * 1000, 2),
+    }
+
+
+async def load(conn, vectors: np.ndarray, times: list[datetime], start: int) -> None:
+    for offset in range(0, len(vectors), CHUNK):
+        chunk = vectors[offset:offset + CHUNK]
+        await conn.execute(
+            f"""INSERT INTO {TABLE} (id, created_at, embedding)
+                SELECT i, t, v::vector FROM unnest($1::int[], $2::timestamp[], $3::text[])
+                AS u(i, t, v)""",
+            list(range(start + offset, start + offset + len(chunk))),
+            times[offset:offset + len(chunk)],
+            [_vector_literal(v) for v in chunk],
+        )
+
+
+async def sql_search(conn, query: np.ndarray, k: int, since, setup: list[str]) -> list[str]:
+    async with conn.transaction():
+        for statement in setup:
+            await conn.execute(statement)
+        rows = await conn.fetch(
+            f"""SELECT id FROM {TABLE}
+                WHERE ($2::timestamp IS NULL OR created_at >= $2)
+                ORDER BY embedding <=> $1::text::vector LIMIT $3""",
+            _vector_literal(query), since, k,
+        )
+    return [str(r["id"]) for r in rows]
+
+
+def _score(
+    results: list[list[str]], truth: list[list[str]], duplicates: list[bool], k: int
+) -> dict:
+    top1 = [bool(r) and r[0] == t[0] for r, t in zip(results, truth)]
+    recall = [len(set(r) & set(t)) / len(t) for r, t in zip(results, truth)]
+    # Of the queries exact search calls duplicates, how many the ANN answer still catches
+    caught = [hit for hit, dup in zip(top1, duplicates) if dup]
+    return {
+        "recall@1": round(sum(top1) / len(top1), 4),
+        f"recall@{k}": round(sum(recall) / len(recall), 4),
+        "duplicates_caught": round(sum(caught) / len(caught), 4) if caught else None,
+    }
+
+
+async def main_async(args):
+    import asyncpg
+
+    rng = np.random.default_rng(args.seed)
+    sizes = sorted(int(s) for s in args.sizes.split(","))
+    ef_values = [int(e) for e in args.ef_search.split(",")]
+    iterative = (
+        [f"SET LOCAL hnsw.iterative_scan = {args.iterative_scan}"]
+        if args.iterative_scan != "off" else []
+    )
+
+    conn = await asyncpg.connect(args.dsn or _get_dsn())
+    await conn.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    await conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    await conn.execute(
+        f"CREATE TABLE {TABLE} (id int PRIMARY KEY, created_at timestamp, "
+        f"embedding vector({DIMENSIONS}))"
+    )
+    await conn.execute(
+        f"CREATE INDEX ON {TABLE} USING hnsw (embedding vector_cosine_ops) "
+        f"WITH (m = 16, ef_construction = 64)"
+    )
+    await conn.execute(f"CREATE INDEX ON {TABLE} (created_at)")
+
+    index = VectorIndex()
+    now = datetime.utcnow()
+    since = now - timedelta(hours=args.window_hours) if args.window_hours else None
+    loaded = 0
+    try:
+        for size in sizes:
+            # Grow the table; created_at is spread over --history-days
+            count = size - loaded
+            vectors = synthetic_vectors(rng, count, args.spread)
+            ages = np.sort(rng.uniform(0, args.history_days * 24, count))[::-1]
+            times = [now - timedelta(hours=float(h)) for h in ages]
+            started = time.perf_counter()
+            await load(conn, vectors, times, loaded)
+            load_seconds = time.perf_counter() - started
+            for i, (vector, moment) in enumerate(zip(vectors, times)):
+                index.add(str(loaded + i), vector, moment)
+            loaded = size
+            await conn.execute(f"ANALYZE {TABLE}")
+
+            # Queries: noisy copies of stored rows (the near-duplicates dedup must catch)
+            picks = rng.integers(0, loaded, args.queries)
+            base = np.stack([index._matrix[p] for p in picks])
+            queries = base + args.query_noise * rng.normal(size=base.shape).astype(np.float32)
+
+            truth, duplicates, memory_times = [], [], []
+            for query in queries:
+                started = time.perf_counter()
+                matches = index.search(query, k=args.k, window_hours=args.window_hours or None)
+                memory_times.append(time.perf_counter() - started)
+                truth.append([m[0] for m in matches])
+                duplicates.append(bool(matches) and matches[0][1] >= args.threshold)
+            kept = [i for i, t in enumerate(truth) if t]
+            queries = [queries[i] for i in kept]
+            truth = [truth[i] for i in kept]
+            duplicates = [duplicates[i] for i in kept]
+
+            report = {"in-memory exact": _percentiles(memory_times)}
+            exact_times = []
+            for query in queries:
+                started = time.perf_counter()
+                await sql_search(conn, query, args.k, since, [
+                    "SET LOCAL enable_indexscan = off",
+                    "SET LOCAL enable_bitmapscan = off",
+                ])
+                exact_times.append(time.perf_counter() - started)
+            report["sql exact"] = _percentiles(exact_times)
+
+            for ef in ef_values:
+                results, hnsw_times = [], []
+                for query in queries:
+                    started = time.perf_counter()
+                    results.append(await sql_search(
+                        conn, query, args.k, since,
+                        [f"SET LOCAL hnsw.ef_search = {ef}"] + iterative,
+                    ))
+                    hnsw_times.append(time.perf_counter() - started)
+                report[f"hnsw ef={ef}"] = {
+                    **_percentiles(hnsw_times), **_score(results, truth, duplicates, args.k)
+                }
+
+            print(f"\n{size} rows (loaded {count} in {load_seconds:.1f}s), {len(queries)} queries")
+            for name, stats in report.items():
+                print(f"  {name:<16} {stats}")
+    finally:
+        if not args.keep:
+            await conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        await conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--dsn", default="", help="defaults to DATABASE_URL")
+    parser.add_argument("--sizes", default="10000,50000,100000")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--ef-search", default="20,40,100")
+    parser.add_argument("--iterative-scan", default=settings.PGVECTOR_ITERATIVE_SCAN)
+    parser.add_argument("--window-hours", type=float, default=0, help="0 = whole history")
+    parser.add_argument("--history-days", type=float, default=365)
+    parser.add_argument("--threshold", type=float, default=settings.DEDUP_SIMILARITY_THRESHOLD)
+    parser.add_argument("--spread", type=float, default=0.8, help="cluster noise vs centre")
+    parser.add_argument("--query-noise", type=float, default=0.01, help="per-dimension noise")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch table")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
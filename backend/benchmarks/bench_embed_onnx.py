@@ -0,0 +1,150 @@
+"""Parity check and benchmark: int8 ONNX embedding backend vs torch sentence-transformers.
+
+  - cold start: fresh interpreter, import app.services.embeddings, load the
+    model and embed one text (also reports whether torch got imported);
+  - parity: cosine similarity between the two backends' vectors for the same
+    text, drift of pairwise similarities, and agreement of dedup verdicts
+    (pair similarity >= DEDUP_SIMILARITY_THRESHOLD) and nearest neighbours;
+  - throughput: texts/s per backend at each --batch-sizes.
+
+Exits non-zero if any per-text cosine falls below --min-cosine, so it can
+gate a model or onnxruntime upgrade. Needs both backends installed.
+Run from backend/:
+    python -m benchmarks.bench_embed_onnx
+    python -m benchmarks.bench_embed_onnx --skip-cold-start --batch-sizes 1,32
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from app.core.config import settings
+
+HEADLINES = [
+    "OpenAI releases a new reasoning model that beats GPT-4 on math benchmarks",
+    "OpenAI's latest model tops math benchmarks, outperforming GPT-4",
+    "Nvidia unveils next-generation Blackwell GPUs for AI data centers",
+    "Nvidia announces Blackwell, its new data-center GPU for AI training",
+    "Google DeepMind open-sources a protein structure prediction model",
+    "Meta releases Llama weights under a more permissive license",
+    "Meta's new Llama model ships with open weights and a relaxed license",
+    "Anthropic raises new funding round to expand compute capacity",
+    "EU lawmakers agree on final text of the AI Act",
+    "European Parliament approves the AI Act after final negotiations",
+    "Apple brings on-device language models to the iPhone",
+    "Microsoft integrates Copilot into Windows taskbar for all users",
+    "Startup builds humanoid robot for warehouse picking",
+    "Researchers show jailbreak attacks transfer across chatbots",
+    "New study finds AI coding assistants increase developer productivity",
+    "Hugging Face launches hosted inference endpoints for open models",
+    "AMD challenges Nvidia with MI300 accelerators for AI inference",
+    "Tesla expands Full Self-Driving beta to more countries",
+    "Stability AI releases a faster image generation model",
+    "Mistral publishes a mixture-of-experts model with open weights",
+    "Mistral's new open-weight mixture-of-experts model is out",
+    "Amazon invests billions in AI startup partnership",
+    "Quantum computing startup claims error-correction milestone",
+    "Samsung starts mass production of HBM memory for AI chips",
+]
+
+
+def _sample_texts(count: int) -> list[str]:
+    """Headlines plus the dedup-style 'title + content' text, repeated to `count`."""
+    base = [f"{h} {h.lower()} according to the announcement." for h in HEADLINES]
+    return [base[i % len(base)] + ("" if i < len(base) else f" ({i})") for i in range(count)]
+
+
+def cold_start(backend: str) -> dict:
+    code = (
+        "import sys, time; start = time.perf_counter()\n"
+        "from app.services import embeddings\n"
+        "embeddings._get_model().encode(['warm up'], convert_to_numpy=True)\n"
+        "print(round(time.perf_counter() - start, 2), 'torch' in sys.modules)\n"
+    )
+    env = {**os.environ, "EMBED_BACKEND": backend}
+    out = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True
+    ).stdout.split()
+    return {"seconds": float(out[-2]), "torch_imported": out[-1] == "True"}
+
+
+def parity(reference: np.ndarray, candidate: np.ndarray, threshold: float) -> dict:
+    per_text = np.sum(reference * candidate, axis=1)
+    sim_ref = reference @ reference.T
+    sim_new = candidate @ candidate.T
+    upper = np.triu_indices(len(reference), k=1)
+    drift = np.abs(sim_ref - sim_new)[upper]
+    np.fill_diagonal(sim_ref, -1)
+    np.fill_diagonal(sim_new, -1)
+    return {
+        "cosine_min": round(float(per_text.min()), 5),
+        "cosine_mean": round(float(per_text.mean()), 5),
+        "pair_drift_max": round(float(drift.max()), 5),
+        "pair_drift_mean": round(float(drift.mean()), 5),
+        "dedup_agreement": round(
+            float(np.mean((sim_ref[upper] >= threshold) == (sim_new[upper] >= threshold))), 5
+        ),
+        "neighbour_agreement": round(
+            float(np.mean(sim_ref.argmax(axis=1) == sim_new.argmax(axis=1))), 5
+        ),
+    }
+
+
+def throughput(model, texts: list[str], batch_size: int) -> float:
+    start = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        model.encode(texts[i:i + batch_size], batch_size=batch_size, convert_to_numpy=True)
+    return round(len(texts) / (time.perf_counter() - start), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--texts", type=int, default=512)
+    parser.add_argument("--batch-sizes", default="1,8,32")
+    parser.add_argument("--min-cosine", type=float, default=0.98)
+    parser.add_argument("--skip-cold-start", action="store_true")
+    args = parser.parse_args()
+
+    report = {}
+    if not args.skip_cold_start:
+        report["cold_start"] = {b: cold_start(b) for b in ("torch", "onnx")}
+
+    from sentence_transformers import SentenceTransformer
+
+    from app.services.embedding_onnx import load_onnx_embedder
+
+    models = {
+        "torch": SentenceTransformer("all-MiniLM-L6-v2"),
+        "onnx": load_onnx_embedder(),
+    }
+    texts = _sample_texts(len(HEADLINES))
+    vectors = {
+        name: np.asarray(m.encode(texts, convert_to_numpy=True), dtype=np.float32)
+        for name, m in models.items()
+    }
+    vectors["torch"] /= np.linalg.norm(vectors["torch"], axis=1, keepdims=True)
+    report["parity"] = parity(
+        vectors["torch"], vectors["onnx"], settings.DEDUP_SIMILARITY_THRESHOLD
+    )
+
+    corpus = _sample_texts(args.texts)
+    report["texts_per_second"] = {
+        f"batch={size}": {name: throughput(m, corpus, size) for name, m in models.items()}
+        for size in (int(s) for s in args.batch_sizes.split(","))
+    }
+
+    print(f"ONNX model: {settings.EMBED_ONNX_DIR or settings.EMBED_ONNX_REPO}/"
+          f"{settings.EMBED_ONNX_FILE}")
+    print(json.dumps(report, indent=2))
+    if report["parity"]["cosine_min"] < args.min_cosine:
+        print(f"FAIL: cosine_min below {args.min_cosine}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
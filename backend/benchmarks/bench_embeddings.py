@@ -0,0 +1,82 @@
+"""Benchmark embedding throughput and event-loop lag: one-by-one vs micro-batched.
+
+"inline" encodes each text with its own model.encode call on the event loop
+(the old generate_embedding); "batched" submits all texts concurrently to
+app.services.embeddings, which groups them into batches of up to
+--batch-sizes and encodes them in the worker thread.
+
+Run from backend/ (needs the embedding model installed):
+    python -m benchmarks.bench_embeddings
+    python -m benchmarks.bench_embeddings --texts 1000 --batch-sizes 1,8,32,64
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.core.config import settings
+from app.services import embeddings
+
+SAMPLE = (
+    "{i}: A new open-weight language model tops reasoning benchmarks while cutting "
+    "inference cost, and the lab says it will release training details next month."
+)
+
+
+async def _ticker(stop: asyncio.Event, lags: list[float]):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append((time.perf_counter() - start - 0.001) * 1000)
+
+
+async def run_mode(texts: list[str], batch_size: int | None) -> dict:
+    lags: list[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(stop, lags))
+    await asyncio.sleep(0.01)
+
+    start = time.perf_counter()
+    if batch_size is None:
+        model = embeddings._get_model()
+        for text in texts:
+            model.encode(text, convert_to_numpy=True)
+            await asyncio.sleep(0)
+    else:
+        embeddings._batcher = embeddings.EmbeddingBatcher(
+            batch_size, settings.EMBED_BATCH_WINDOW_MS / 1000
+        )
+        await embeddings.generate_embeddings(texts)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await ticker
+    return {
+        "texts_per_second": round(len(texts) / elapsed, 1),
+        "lag_p50_ms": round(statistics.median(lags), 2) if lags else None,
+        "lag_max_ms": round(max(lags), 2) if lags else None,
+    }
+
+
+async def main_async(args):
+    texts = [SAMPLE.format(i=i) for i in range(args.texts)]
+    embeddings._get_model()  # load outside the timed runs
+    await embeddings.generate_embeddings(texts[:8])
+
+    print(f"{args.texts} texts")
+    print(f"  inline       {await run_mode(texts, None)}")
+    for size in (int(s) for s in args.batch_sizes.split(",")):
+        print(f"  batch={size:<6} {await run_mode(texts, size)}")
+    embeddings.shutdown_embed_executor()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--texts", type=int, default=500)
+    parser.add_argument("--batch-sizes", default="1,8,32,64")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Benchmark event-loop latency while parsing RSS feeds inline vs off-loop.
+
+A ticker coroutine sleeps 1 ms in a loop and records how late it wakes up;
+meanwhile every fixture feed is parsed repeatedly, either directly on the
+event loop (the old behaviour) or through app.services.rss._parse_off_loop.
+
+Run from backend/:
+    python -m benchmarks.bench_rss_parse              # use fixtures/*.xml
+    python -m benchmarks.bench_rss_parse --record     # refresh fixtures from RSS_FEEDS first
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from app.core.config import settings
+from app.services import rss
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+async def record_fixtures():
+    """Download the configured feeds into fixtures/ for realistic inputs."""
+    import httpx
+
+    async with httpx.AsyncClient(timeout=15.0, follow_redirects=True) as client:
+        for feed in rss.RSS_FEEDS:
+            try:
+                response = await client.get(feed["url"])
+                response.raise_for_status()
+            except Exception as e:
+                print(f"  skip {feed['name']}: {e}")
+                continue
+            slug = feed["name"].lower().replace(" ", "_")
+            (FIXTURES / f"{slug}.xml").write_text(response.text, encoding="utf-8")
+            print(f"  recorded {feed['name']} ({len(response.text) // 1024} KiB)")
+
+
+async def _ticker(stop: asyncio.Event, lags: list[float]):
+    """Measure how late a 1 ms sleep wakes up while other work runs."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append((time.perf_counter() - start - 0.001) * 1000)
+
+
+async def run_mode(texts: list[str], rounds: int, offload: bool) -> dict:
+    lags: list[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(stop, lags))
+    await asyncio.sleep(0.01)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        if offload:
+            await asyncio.gather(*(rss._parse_off_loop(t, rss.MAX_PER_FEED) for t in texts))
+        else:
+            for t in texts:
+                rss.parse_feed_entries(t, rss.MAX_PER_FEED)
+                await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await ticker
+    lags.sort()
+    return {
+        "elapsed_s": elapsed,
+        "ticks": len(lags),
+        "p50_ms": statistics.median(lags),
+        "p99_ms": (
+            statistics.quantiles(lags, n=100, method="inclusive")[98]
+            if len(lags) > 1 else lags[-1]
+        ),
+        "max_ms": lags[-1],
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--record", action="store_true", help="re-record fixtures first")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.record:
+        print("Recording fixtures...")
+        await record_fixtures()
+
+    texts = [p.read_text(encoding="utf-8") for p in sorted(FIXTURES.glob("*.xml"))]
+    if not texts:
+        print(f"No fixtures in {FIXTURES}")
+        sys.exit(1)
+
+    print("=" * 60)
+    print(f"RSS parse benchmark: {len(texts)} feeds x {args.rounds} rounds")
+    print(f"Executor: {settings.RSS_PARSE_EXECUTOR} x {settings.RSS_PARSE_WORKERS}")
+    print("=" * 60)
+
+    for label, offload in (("inline", False), ("offloaded", True)):
+        r = await run_mode(texts, args.rounds, offload)
+        print(
+            f"  {label:<10} parse={r['elapsed_s']:.2f}s ticks={r['ticks']:<5} "
+            f"lag p50={r['p50_ms']:.1f}ms p99={r['p99_ms']:.1f}ms max={r['max_ms']:.1f}ms"
+        )
+
+    rss.shutdown_parse_executor()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
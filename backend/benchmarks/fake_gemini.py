@@ -0,0 +1,267 @@
+"""Local stand-in for the Gemini generateContent API.
+
+Answers generateContent / streamGenerateContent with deterministic JSON that
+matches the request's response schema (same prompt -> same output), after a
+configurable latency, and injects 429 / 5xx errors on demand. Point the
+backend at it with GEMINI_BASE_URL=http://127.0.0.1:8090 (any API key works).
+
+Run from backend/:
+    python -m benchmarks.fake_gemini
+    python -m benchmarks.fake_gemini --latency lognormal:0.8,0.5 --tail 0.01:30
+    python -m benchmarks.fake_gemini --error-rate 0.02 --throttle-rate 0.05 --rpm 600
+
+Latency specs: fixed:S, uniform:LO,HI, lognormal:MEDIAN,SIGMA, exp:MEAN (seconds).
+--tail P:S adds a stall of S seconds to a fraction P of requests.
+Context caching is answered with 400, so clients exercise their fallback.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+WORDS = (
+    "model open release agents chips inference research startup funding benchmark "
+    "training safety robotics developers cloud launch update data reasoning vision"
+).split()
+
+
+@dataclass
+class FakeConfig:
+    latency: str = "lognormal:0.6,0.4"
+    tail: str = ""  # "P:SECONDS"
+    error_rate: float = 0.0  # fraction answered with 500/503
+    throttle_rate: float = 0.0  # fraction answered with 429
+    rpm: int = 0  # requests per minute before 429s (0 = unlimited)
+    retry_delay: float = 1.0  # RetryInfo delay sent with 429s
+    seed: int = 0
+    stats: dict = field(default_factory=lambda: {"requests": 0, "ok": 0, "429": 0, "5xx": 0})
+
+
+def sample_latency(spec: str, rng: random.Random) -> float:
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed":
+        return values[0]
+    if kind == "uniform":
+        return rng.uniform(values[0], values[1])
+    if kind == "lognormal":
+        return rng.lognormvariate(math.log(values[0]), values[1])
+    if kind == "exp":
+        return rng.expovariate(1 / values[0])
+    raise ValueError(f"Unknown latency spec: {spec}")
+
+
+def _digest(*parts: str) -> bytes:
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).digest()
+
+
+def _limit(schema: dict, name: str, default):
+    """Schema keyword in either camelCase (REST) or snake_case (SDK serialization)."""
+    snake = re.sub(r"([A-Z])", lambda m: "_" + m.group(1).lower(), name)
+    value = schema.get(name, schema.get(snake))
+    return default if value is None else int(float(value))
+
+
+def fake_value(schema: dict, seed: str, prompt: str, top_level: bool = True):
+    """Deterministic instance of an OpenAPI / JSON schema, derived from `seed`."""
+    kind = str(schema.get("type", "object")).lower()
+    if isinstance(schema.get("anyOf"), list):
+        options = [s for s in schema["anyOf"] if str(s.get("type", "")).lower() != "null"]
+        return fake_value(options[0] if options else {"type": "string"}, seed, prompt, top_level)
+    digest = _digest(seed, prompt)
+
+    if kind == "object":
+        props = schema.get("properties", {})
+        return {
+            name: fake_value(sub, f"{seed}.{name}", prompt, top_level=False)
+            for name, sub in props.items()
+        }
+    if kind == "array":
+        items = schema.get("items", {"type": "string"})
+        item_props = items.get("properties", {})
+        # Batch scoring: one entry per "--- Article N ---" block in the prompt
+        if top_level and "id" in item_props:
+            ids = re.findall(r"--- Article (\S+) ---", prompt) or ["0"]
+            values = []
+            for article_id in ids:
+                value = fake_value(items, f"{seed}[{article_id}]", prompt, top_level=False)
+                value["id"] = article_id
+                values.append(value)
+            return values
+        low = _limit(schema, "minItems", 1)
+        high = _limit(schema, "maxItems", max(low, 3))
+        # Variant requests ask for "Write N alternative tweets"
+        wanted = re.search(r"Write (\d+) alternative", prompt) if top_level else None
+        count = int(wanted.group(1)) if wanted else low + digest[0] % (high - low + 1)
+        return [fake_value(items, f"{seed}[{i}]", prompt, top_level=False) for i in range(count)]
+    if kind == "integer":
+        low = _limit(schema, "minimum", 1)
+        high = _limit(schema, "maximum", 10)
+        return low + digest[0] % (high - low + 1)
+    if kind == "number":
+        return round(digest[0] / 255, 3)
+    if kind == "boolean":
+        return bool(digest[0] % 2)
+
+    max_len = _limit(schema, "maxLength", 200)
+    if seed.endswith("hashtags[0]") or seed.endswith("hashtags[1]"):
+        return "#" + WORDS[digest[1] % len(WORDS)].capitalize()
+    words = [WORDS[b % len(WORDS)] for b in digest[: 8 + digest[0] % 16]]
+    return " ".join(words).capitalize()[:max_len]
+
+
+def _prompt_text(body: dict) -> str:
+    parts = []
+    for content in [body.get("systemInstruction") or {}] + (body.get("contents") or []):
+        for part in content.get("parts", []) if isinstance(content, dict) else []:
+            parts.append(part.get("text", ""))
+    return "\n".join(parts)
+
+
+def _response_schema(body: dict) -> dict:
+    config = body.get("generationConfig") or {}
+    return config.get("responseJsonSchema") or config.get("responseSchema") or {"type": "string"}
+
+
+def _error(code: int, status: str, message: str, details: list | None = None) -> JSONResponse:
+    return JSONResponse(
+        {"error": {"code": code, "message": message, "status": status, "details": details or []}},
+        status_code=code,
+    )
+
+
+def create_app(config: FakeConfig) -> FastAPI:
+    app = FastAPI(title="Fake Gemini")
+    rng = random.Random(config.seed)
+    recent: deque[float] = deque()
+
+    async def gate() -> JSONResponse | None:
+        """Latency plus injected failures; returns an error response or None."""
+        config.stats["requests"] += 1
+        now = time.monotonic()
+        while recent and now - recent[0] > 60:
+            recent.popleft()
+        over_quota = config.rpm and len(recent) >= config.rpm
+        recent.append(now)
+
+        delay = sample_latency(config.latency, rng)
+        if config.tail:
+            probability, seconds = (float(v) for v in config.tail.split(":"))
+            if rng.random() < probability:
+                delay += seconds
+        roll = rng.random()
+        if over_quota or roll < config.throttle_rate:
+            await asyncio.sleep(min(delay, 0.05))
+            config.stats["429"] += 1
+            return _error(429, "RESOURCE_EXHAUSTED", "Resource has been exhausted (fake quota).", [{
+                "@type": "type.googleapis.com/google.rpc.RetryInfo",
+                "retryDelay": f"{config.retry_delay:g}s",
+            }])
+        await asyncio.sleep(delay)
+        if roll < config.throttle_rate + config.error_rate:
+            config.stats["5xx"] += 1
+            return _error(503, "UNAVAILABLE", "The model is overloaded (fake).")
+        config.stats["ok"] += 1
+        return None
+
+    def payload(model: str, body: dict) -> tuple[str, dict]:
+        prompt = _prompt_text(body)
+        text = json.dumps(fake_value(_response_schema(body), model, prompt))
+        prompt_tokens = len(prompt) // 4
+        output_tokens = len(text) // 4
+        return text, {
+            "promptTokenCount": prompt_tokens,
+            "candidatesTokenCount": output_tokens,
+            "totalTokenCount": prompt_tokens + output_tokens,
+        }
+
+    def response(model: str, text: str, usage: dict | None) -> dict:
+        data = {
+            "candidates": [{
+                "content": {"role": "model", "parts": [{"text": text}]},
+                "finishReason": "STOP",
+                "index": 0,
+            }],
+            "modelVersion": model,
+        }
+        if usage:
+            data["usageMetadata"] = usage
+        return data
+
+    @app.post("/{version}/models/{model}:generateContent")
+    async def generate_content(version: str, model: str, request: Request):
+        error = await gate()
+        if error is not None:
+            return error
+        text, usage = payload(model, await request.json())
+        return response(model, text, usage)
+
+    @app.post("/{version}/models/{model}:streamGenerateContent")
+    async def stream_generate_content(version: str, model: str, request: Request):
+        error = await gate()
+        if error is not None:
+            return error
+        text, usage = payload(model, await request.json())
+
+        async def events():
+            pieces = [text[i:i + 12] for i in range(0, len(text), 12)]
+            for i, piece in enumerate(pieces):
+                last = i == len(pieces) - 1
+                yield f"data: {json.dumps(response(model, piece, usage if last else None))}\r\n\r\n"
+                await asyncio.sleep(0.02)
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/{version}/cachedContents")
+    async def create_cached_content(version: str):
+        return _error(
+            400, "INVALID_ARGUMENT", "Context caching is not supported by the fake server."
+        )
+
+    @app.get("/stats")
+    async def stats():
+        return config.stats
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", default=FakeConfig.latency)
+    parser.add_argument("--tail", default="", help="P:SECONDS stall for a fraction of requests")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--rpm", type=int, default=0)
+    parser.add_argument("--retry-delay", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = FakeConfig(
+        latency=args.latency,
+        tail=args.tail,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        rpm=args.rpm,
+        retry_delay=args.retry_delay,
+        seed=args.seed,
+    )
+    sample_latency(config.latency, random.Random())  # fail fast on a bad spec
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
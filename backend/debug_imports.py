@@ -37,6 +37,7 @@ if __name__ == "__main__":
     timed_import("sqlalchemy", "import sqlalchemy")
     timed_import("sqlalchemy.ext.asyncio", "from sqlalchemy.ext.asyncio import create_async_engine")
     timed_import("numpy", "import numpy")
+    timed_import("onnxruntime", "import onnxruntime")
 
     # Layer 3: API/AI dependencies
     print("\n--- Layer 3: API/AI Dependencies ---")
@@ -0,0 +1,5 @@
+-- Canonical URL for dedup across tracking params, AMP, www and redirect variants.
+-- Run backfill_canonical_url.py afterwards to fill existing rows. save_article
+-- inserts with ON CONFLICT (canonical_url) DO NOTHING, so it needs this index.
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS canonical_url text;
+CREATE UNIQUE INDEX IF NOT EXISTS articles_canonical_url_key ON articles (canonical_url);
@@ -0,0 +1,10 @@
+-- pgvector copy of articles.embedding with an HNSW index, for DEDUP_BACKEND=pgvector.
+-- Nearest-neighbour dedup then runs in SQL, so its cost stays flat as history grows
+-- and every replica shares one index. save_article writes embedding_vec only with
+-- DEDUP_BACKEND=pgvector: run backfill_embedding_vec.py before switching over
+-- to fill rows saved without it.
+CREATE EXTENSION IF NOT EXISTS vector;
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS embedding_vec vector(384);
+CREATE INDEX IF NOT EXISTS articles_embedding_vec_hnsw ON articles
+    USING hnsw (embedding_vec vector_cosine_ops) WITH (m = 16, ef_construction = 64);
+CREATE INDEX IF NOT EXISTS articles_created_at_idx ON articles (created_at);
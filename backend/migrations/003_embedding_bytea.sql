@@ -0,0 +1,14 @@
+-- Store embeddings as packed little-endian float32/float16 bytes instead of
+-- double precision[] (1.5 KB instead of ~3 KB per row, no per-element decode).
+-- The old column is kept as embedding_legacy until backfill_embedding_bytes.py
+-- has converted it (run it with --drop-legacy to remove the column afterwards).
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'articles' AND column_name = 'embedding' AND data_type = 'ARRAY'
+    ) THEN
+        ALTER TABLE articles RENAME COLUMN embedding TO embedding_legacy;
+        ALTER TABLE articles ADD COLUMN embedding bytea;
+    END IF;
+END $$;
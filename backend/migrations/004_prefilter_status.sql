@@ -0,0 +1,6 @@
+-- Prefilter rejections get their own status and keep the verdict score, so they
+-- are not mixed up with moderator rejections and can be audited / requeued.
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS prefilter_score real;
+-- Earlier prefilter rejections: 'rejected' without a score or a moderation time
+UPDATE articles SET status = 'filtered'
+    WHERE status = 'rejected' AND relevance_score IS NULL AND moderated_at IS NULL;
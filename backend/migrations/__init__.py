@@ -0,0 +1 @@
+"""SQL migrations and one-off data backfills (run in filename order)."""
@@ -0,0 +1,35 @@
+"""Backfill articles.canonical_url for rows saved before 001_canonical_url.sql.
+
+Rows are processed oldest first; a row whose canonical URL is already taken
+by an older article is a duplicate and keeps canonical_url NULL.
+Run from backend/: python -m migrations.backfill_canonical_url
+"""
+
+import asyncio
+
+from app.services.database import get_pool
+from app.services.urls import canonicalize_url
+
+
+async def main():
+    import asyncpg
+
+    pool = await get_pool()
+    rows = await pool.fetch(
+        "SELECT id, url FROM articles WHERE canonical_url IS NULL ORDER BY created_at"
+    )
+    updated = duplicates = 0
+    for row in rows:
+        try:
+            await pool.execute(
+                "UPDATE articles SET canonical_url = $1 WHERE id = $2",
+                canonicalize_url(row["url"]), row["id"],
+            )
+            updated += 1
+        except asyncpg.UniqueViolationError:
+            duplicates += 1
+    print(f"Backfilled {updated} rows, {duplicates} duplicates left NULL")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,45 @@
+"""Backfill articles.embedding (bytea) from embedding_legacy after 003_embedding_bytea.sql.
+
+Rows are converted in batches with pack_embedding (EMBEDDING_STORAGE_DTYPE).
+With --drop-legacy the embedding_legacy column is dropped once no
+unconverted rows remain.
+Run from backend/: python -m migrations.backfill_embedding_bytes [--drop-legacy]
+"""
+
+import argparse
+import asyncio
+
+from app.services.database import get_pool
+from app.services.embeddings import pack_embedding
+
+BATCH_SIZE = 1000
+
+
+async def main(drop_legacy: bool):
+    pool = await get_pool()
+    converted = 0
+    while True:
+        rows = await pool.fetch(
+            """SELECT id, embedding_legacy FROM articles
+               WHERE embedding IS NULL AND embedding_legacy IS NOT NULL LIMIT $1""",
+            BATCH_SIZE,
+        )
+        if not rows:
+            break
+        await pool.executemany(
+            "UPDATE articles SET embedding = $1 WHERE id = $2",
+            [(pack_embedding(r["embedding_legacy"]), r["id"]) for r in rows],
+        )
+        converted += len(rows)
+        print(f"Converted {converted} rows")
+    print(f"Backfilled {converted} rows")
+
+    if drop_legacy:
+        await pool.execute("ALTER TABLE articles DROP COLUMN IF EXISTS embedding_legacy")
+        print("Dropped embedding_legacy")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--drop-legacy", action="store_true")
+    asyncio.run(main(parser.parse_args().drop_legacy))
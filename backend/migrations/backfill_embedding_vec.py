@@ -0,0 +1,40 @@
+"""Backfill articles.embedding_vec for rows saved without it.
+
+save_article only writes embedding_vec with DEDUP_BACKEND=pgvector, so run
+this after 002_pgvector.sql and again right before switching to that backend.
+
+Reads `embedding` in either storage format (double precision[] or the packed
+bytes of 003_embedding_bytea.sql), so it can be re-run at any point.
+Run from backend/: python -m migrations.backfill_embedding_vec
+"""
+
+import asyncio
+
+from app.services.database import _vector_literal, get_pool
+from app.services.embeddings import unpack_embedding
+
+BATCH_SIZE = 1000
+
+
+async def main():
+    pool = await get_pool()
+    filled = 0
+    while True:
+        rows = await pool.fetch(
+            """SELECT id, embedding FROM articles
+               WHERE embedding_vec IS NULL AND embedding IS NOT NULL LIMIT $1""",
+            BATCH_SIZE,
+        )
+        if not rows:
+            break
+        await pool.executemany(
+            "UPDATE articles SET embedding_vec = $1::text::vector WHERE id = $2",
+            [(_vector_literal(unpack_embedding(r["embedding"])), r["id"]) for r in rows],
+        )
+        filled += len(rows)
+        print(f"Filled {filled} rows")
+    print(f"Backfilled {filled} rows")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,55 @@
+"""Hedged requests and their concurrency slot."""
+
+import asyncio
+
+from app.services.ai_latency import LatencyHistogram, run_hedged
+from app.services.ai_limiter import AdaptiveLimiter
+
+
+def _slot_hooks(limiter: AdaptiveLimiter):
+    async def before_hedge() -> bool:
+        return limiter.try_acquire_slot()
+
+    return before_hedge, limiter.release_slot
+
+
+async def test_hedge_takes_a_slot_and_gives_it_back():
+    limiter = AdaptiveLimiter(2, requests_per_minute=0, tokens_per_minute=0)
+    histogram = LatencyHistogram()
+    calls = []
+
+    async def call():
+        calls.append(limiter.in_flight)
+        await asyncio.sleep(0.05 if len(calls) == 1 else 0)
+        return len(calls)
+
+    before, after = _slot_hooks(limiter)
+    assert limiter.try_acquire_slot()  # the primary attempt's slot
+    result = await run_hedged(call, histogram, 1.0, 0.01, before, after)
+    limiter.release_slot()
+
+    assert result == 2
+    assert calls == [1, 2]
+    assert histogram.hedges == 1 and histogram.hedge_wins == 1
+    assert limiter.in_flight == 0
+
+
+async def test_hedge_is_skipped_without_a_free_slot():
+    limiter = AdaptiveLimiter(1, requests_per_minute=0, tokens_per_minute=0)
+    histogram = LatencyHistogram()
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.03)
+        return "primary"
+
+    before, after = _slot_hooks(limiter)
+    assert limiter.try_acquire_slot()
+    assert await run_hedged(call, histogram, 1.0, 0.01, before, after) == "primary"
+    limiter.release_slot()
+
+    assert calls == 1
+    assert histogram.hedges == 0 and histogram.hedges_skipped == 1
+    assert limiter.in_flight == 0
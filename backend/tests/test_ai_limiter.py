@@ -0,0 +1,105 @@
+"""AdaptiveLimiter slot accounting."""
+
+import asyncio
+
+import pytest
+
+from app.services.ai_limiter import AdaptiveLimiter, Priority
+
+
+def _limiter(concurrency: int = 1) -> AdaptiveLimiter:
+    return AdaptiveLimiter(concurrency, requests_per_minute=0, tokens_per_minute=0)
+
+
+async def _ok():
+    return "stream"
+
+
+async def test_holding_keeps_the_slot_until_the_block_exits():
+    limiter = _limiter()
+    async with limiter.holding(_ok) as result:
+        assert result == "stream"
+        assert limiter.in_flight == 1
+        waiter = asyncio.create_task(limiter.run(_ok))
+        await asyncio.sleep(0)
+        assert not waiter.done()  # the drained stream still counts against the limit
+    assert await waiter == "stream"
+    assert limiter.in_flight == 0
+
+
+async def test_holding_releases_the_slot_when_the_call_fails():
+    limiter = _limiter()
+
+    async def fail():
+        raise ValueError("not retryable")
+
+    with pytest.raises(ValueError):
+        async with limiter.holding(fail, priority=Priority.INTERACTIVE):
+            pass
+    assert limiter.in_flight == 0
+
+
+async def test_waiters_are_served_by_priority_then_age():
+    limiter = _limiter()
+    order = []
+    gate = asyncio.Event()
+
+    async def blocker():
+        await gate.wait()
+
+    def record(name):
+        async def call():
+            order.append(name)
+        return call
+
+    running = asyncio.create_task(limiter.run(blocker))
+    await asyncio.sleep(0)
+    waiters = [
+        asyncio.create_task(limiter.run(record("bulk-1"), priority=Priority.BULK)),
+        asyncio.create_task(limiter.run(record("bulk-2"), priority=Priority.BULK)),
+        asyncio.create_task(limiter.run(record("interactive"), priority=Priority.INTERACTIVE)),
+    ]
+    await asyncio.sleep(0)
+    assert limiter.stats()["queues"]["bulk"]["depth"] == 2
+
+    gate.set()
+    await asyncio.gather(running, *waiters)
+    assert order == ["interactive", "bulk-1", "bulk-2"]
+    assert limiter.in_flight == 0
+
+
+async def test_cancelled_waiter_does_not_take_a_slot():
+    limiter = _limiter()
+    async with limiter.holding(_ok):
+        cancelled = asyncio.create_task(limiter.run(_ok))
+        queued = asyncio.create_task(limiter.run(_ok))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+    assert await queued == "stream"
+    assert cancelled.cancelled()
+    assert limiter.in_flight == 0
+
+
+async def test_waiter_cancelled_after_being_woken_gives_the_slot_back():
+    limiter = _limiter()
+    async with limiter.holding(_ok):
+        waiter = asyncio.create_task(limiter.run(_ok))
+        await asyncio.sleep(0)
+    # The slot was handed to the waiter, which is cancelled before it resumes
+    assert limiter.in_flight == 1
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert limiter.in_flight == 0
+
+
+def test_throttle_halves_the_limit_and_successes_grow_it():
+    limiter = _limiter(8)
+    limiter._on_throttle()
+    assert limiter.limit == 4
+    limiter._on_throttle()  # same burst: at most one decrease per second
+    assert limiter.limit == 4
+    for _ in range(4):
+        limiter._on_success()
+    assert 4.9 < limiter.limit < 5
@@ -0,0 +1,105 @@
+"""Backlog batch scoring against the local backend, with the database stubbed out."""
+
+from uuid import uuid4
+
+import pytest
+
+from app.core.config import settings
+from app.services import backlog
+from app.services.backlog import BatchStatus, LocalBatchBackend
+
+
+class FakeDB:
+    def __init__(self, count: int):
+        self.rows = [
+            {"id": uuid4(), "title": f"Article {i}", "content": f"Content {i}"}
+            for i in range(count)
+        ]
+        self.writes: list[list[tuple]] = []
+
+    async def get_unscored_articles(self, limit: int) -> list[dict]:
+        return self.rows[:limit]
+
+    async def update_article_scores(self, scores: list[tuple]) -> int:
+        self.writes.append(scores)
+        return len(scores)
+
+
+class ResumableBackend:
+    """Writes back (unlike the local backend) and its jobs finish only once `done`."""
+
+    def __init__(self):
+        self.local = LocalBatchBackend(completion_seconds=0)
+        self.done = False
+        self.submits = 0
+
+    async def submit(self, requests):
+        self.submits += 1
+        return await self.local.submit(requests)
+
+    async def poll(self, name):
+        if not self.done:
+            return BatchStatus(state="JOB_STATE_RUNNING")
+        return await self.local.poll(name)
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    db = FakeDB(5)
+    monkeypatch.setattr(backlog.db, "get_unscored_articles", db.get_unscored_articles)
+    monkeypatch.setattr(backlog.db, "update_article_scores", db.update_article_scores)
+    return db
+
+
+@pytest.fixture
+def jobs_path(tmp_path):
+    return str(tmp_path / "jobs.json")
+
+
+async def test_local_backend_never_writes_back(fake_db, jobs_path):
+    result = await backlog.score_backlog(
+        backend=LocalBatchBackend(completion_seconds=0), poll_seconds=0, jobs_path=jobs_path
+    )
+    assert result["state"] == backlog.SUCCEEDED
+    assert result["dry_run"] is True
+    assert result["valid"] == 5
+    assert result["scored"] == 0
+    assert fake_db.writes == []
+
+
+async def test_local_partial_failures_are_counted(fake_db, jobs_path):
+    result = await backlog.score_backlog(
+        backend=LocalBatchBackend(completion_seconds=0, fail_every=2),
+        poll_seconds=0,
+        jobs_path=jobs_path,
+    )
+    assert result["valid"] == 3
+    assert result["failed"] == 2
+
+
+async def test_submission_is_chunked(fake_db, jobs_path, monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_JOB_MAX_REQUESTS", 2)
+    result = await backlog.score_backlog(
+        backend=LocalBatchBackend(completion_seconds=0), poll_seconds=0, jobs_path=jobs_path
+    )
+    assert len(result["jobs"]) == 3
+    assert result["valid"] == 5
+
+
+async def test_timed_out_jobs_are_resumed_not_resubmitted(fake_db, jobs_path, monkeypatch):
+    backend = ResumableBackend()
+    monkeypatch.setattr(settings, "BATCH_TIMEOUT_HOURS", 0)
+    first = await backlog.score_backlog(backend=backend, poll_seconds=0, jobs_path=jobs_path)
+    assert first["state"] == "TIMEOUT"
+    assert fake_db.writes == []
+
+    backend.done = True
+    second = await backlog.score_backlog(backend=backend, poll_seconds=0, jobs_path=jobs_path)
+    assert second["resumed"] is True
+    assert backend.submits == 1
+    assert second["scored"] == 5
+    assert {key for *_, key in fake_db.writes[0]} == {row["id"] for row in fake_db.rows}
+
+    backend.submits = 0
+    await backlog.score_backlog(backend=backend, poll_seconds=0, jobs_path=jobs_path)
+    assert backend.submits == 1  # job file cleared after write-back: a fresh run submits
@@ -0,0 +1,64 @@
+"""save_article SQL against a recording pool (no Postgres needed)."""
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services import database as db
+from app.services.vector_index import VectorIndex
+
+
+class RecordingPool:
+    def __init__(self):
+        self.calls: list[tuple[str, tuple]] = []
+        self.conflict = False
+
+    async def fetchval(self, query, *args):
+        self.calls.append((query, args))
+        return None if self.conflict else args[0]
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = RecordingPool()
+
+    async def get_pool():
+        return pool
+
+    monkeypatch.setattr(db, "get_pool", get_pool)
+    monkeypatch.setattr(db, "get_vector_index", lambda index=VectorIndex(): index)
+    return pool
+
+
+async def _save():
+    return await db.save_article(
+        "Title", "https://example.com/a", "Content", "Source",
+        embedding=np.ones(384, dtype=np.float32),
+    )
+
+
+async def test_memory_backend_does_not_need_pgvector(pool, monkeypatch):
+    monkeypatch.setattr(settings, "DEDUP_BACKEND", "memory")
+    await _save()
+    query, args = pool.calls[0]
+    assert "embedding_vec" not in query
+    assert "::vector" not in query
+    assert query.count("$") == len(args)
+
+
+async def test_pgvector_backend_writes_the_vector(pool, monkeypatch):
+    monkeypatch.setattr(settings, "DEDUP_BACKEND", "pgvector")
+    await _save()
+    query, args = pool.calls[0]
+    assert "embedding_vec" in query
+    assert f"${len(args)}::text::vector" in query
+    assert args[-1].startswith("[1,1,")
+
+
+async def test_canonical_url_conflict_returns_none(pool, monkeypatch):
+    monkeypatch.setattr(settings, "DEDUP_BACKEND", "memory")
+    pool.conflict = True
+    index = db.get_vector_index()
+    assert await _save() is None
+    assert "ON CONFLICT (canonical_url) DO NOTHING" in pool.calls[0][0]
+    assert len(index) == 0  # nothing indexed for the row that was not inserted
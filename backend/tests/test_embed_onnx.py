@@ -0,0 +1,41 @@
+"""Parity of the ONNX embedding backend with the torch sentence-transformers model.
+
+Skipped unless both backends are installed and the models can be loaded
+(EMBED_ONNX_DIR, or network access to the Hugging Face Hub).
+"""
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from benchmarks.bench_embed_onnx import HEADLINES, _sample_texts, parity
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("tokenizers")
+sentence_transformers = pytest.importorskip("sentence_transformers")
+
+
+@pytest.fixture(scope="module")
+def models():
+    from app.services.embedding_onnx import load_onnx_embedder
+
+    try:
+        return {
+            "torch": sentence_transformers.SentenceTransformer("all-MiniLM-L6-v2"),
+            "onnx": load_onnx_embedder(),
+        }
+    except Exception as e:
+        pytest.skip(f"embedding models not available: {e}")
+
+
+def test_onnx_matches_torch(models):
+    texts = _sample_texts(len(HEADLINES))
+    reference = np.asarray(models["torch"].encode(texts, convert_to_numpy=True), dtype=np.float32)
+    reference /= np.linalg.norm(reference, axis=1, keepdims=True)
+    candidate = models["onnx"].encode(texts, convert_to_numpy=True)
+
+    report = parity(reference, candidate, settings.DEDUP_SIMILARITY_THRESHOLD)
+
+    assert report["cosine_min"] >= 0.98
+    assert report["dedup_agreement"] >= 0.99
+    assert report["neighbour_agreement"] >= 0.95
@@ -0,0 +1,44 @@
+"""Prefilter scoring with a stubbed embedding model."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services import prefilter
+
+
+@pytest.fixture
+def topic_vectors(monkeypatch):
+    """One-hot topic embeddings; records every generate_embeddings call."""
+    calls = []
+
+    async def generate_embeddings(texts):
+        calls.append(list(texts))
+        await asyncio.sleep(0)
+        return [np.eye(1, 16, i, dtype=np.float32)[0] for i in range(len(texts))]
+
+    monkeypatch.setattr(prefilter, "generate_embeddings", generate_embeddings)
+    monkeypatch.setattr(prefilter, "_centroids", None)
+    monkeypatch.setattr(prefilter, "_centroids_lock", None)
+    monkeypatch.setattr(settings, "PREFILTER_MODE", "shadow")
+    return calls
+
+
+async def test_concurrent_evaluations_embed_the_topics_once(topic_vectors):
+    embedding = np.eye(1, 16, 0, dtype=np.float32)[0]
+    verdicts = await asyncio.gather(
+        *(prefilter.evaluate("Title", "Content", embedding) for _ in range(5))
+    )
+    assert topic_vectors == [prefilter.TOPIC_DESCRIPTIONS]
+    assert all(v.topic_similarity == 1.0 for v in verdicts)
+
+
+async def test_keywords_and_topics_blend(topic_vectors):
+    off_topic = np.eye(1, 16, 15, dtype=np.float32)[0] * 3
+    verdict = await prefilter.evaluate("OpenAI ships a new LLM", "", off_topic)
+    assert verdict.topic_similarity == 0.0
+    assert verdict.keyword_score > 0.9
+    assert verdict.score == round(prefilter.KEYWORD_WEIGHT * verdict.keyword_score, 4)
+    assert np.linalg.norm(off_topic) == pytest.approx(3)  # caller's array left alone
@@ -0,0 +1,58 @@
+"""Prompt content cleaning and token-budget trimming."""
+
+from app.core.config import settings
+from app.services.prompt_builder import (
+    CHARS_PER_TOKEN,
+    build_content,
+    clean_paragraphs,
+    fit_to_budget,
+    strip_html,
+)
+
+
+def test_html_is_reduced_to_visible_paragraphs():
+    text = strip_html(
+        "<p>First &amp; foremost.</p><script>track()</script>"
+        "<div>Second<br>line</div><figure><img>Caption</figure>"
+    )
+    assert [line for line in text.split("\n") if line] == ["First & foremost.", "Second", "line"]
+
+
+def test_boilerplate_and_repeats_are_dropped():
+    paragraphs = clean_paragraphs(
+        "<p>The lede.</p><p>  The   lede. </p><p>Read more at the site</p>"
+        "<p>The post Story appeared first on Site.</p><p>Body text.</p>"
+    )
+    assert paragraphs == ["The lede.", "Body text."]
+
+
+def test_whole_paragraphs_are_kept_while_they_fit():
+    paragraphs = ["a" * 40, "b" * 40, "c" * 40]
+    assert fit_to_budget(paragraphs, 21) == "\n".join(paragraphs[:2])
+
+
+def test_overflowing_paragraph_is_cut_at_a_sentence_end():
+    lede = "x" * 20
+    body = "First sentence is here. " * 10
+    text = fit_to_budget([lede, body], 30)
+    assert len(text) <= 30 * CHARS_PER_TOKEN
+    assert text.startswith(lede + "\n")
+    assert text.endswith("here.")
+
+
+def test_overflow_without_sentence_end_is_cut_at_a_word():
+    text = fit_to_budget(["word " * 100], 30)
+    assert text.endswith("word ...")
+    assert len(text) <= 30 * CHARS_PER_TOKEN + 4
+
+
+def test_no_room_for_a_partial_paragraph():
+    assert fit_to_budget(["a" * 100, "b" * 200], 30) == "a" * 100
+
+
+def test_budget_follows_the_call_type(monkeypatch):
+    monkeypatch.setattr(settings, "PROMPT_BATCH_CONTENT_TOKENS", 25)
+    monkeypatch.setattr(settings, "PROMPT_TWEET_CONTENT_TOKENS", 1000)
+    content = "<p>" + "Sentence number one. " * 40 + "</p>"
+    assert len(build_content(content, "score_batch")) <= 25 * CHARS_PER_TOKEN
+    assert len(build_content(content, "tweet")) > 25 * CHARS_PER_TOKEN
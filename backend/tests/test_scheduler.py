@@ -0,0 +1,44 @@
+"""Feed scheduler rate learning from fetch results."""
+
+from datetime import datetime, timedelta, timezone
+
+from app.services.rss import FeedFetch
+from app.services.scheduler import FeedScheduler
+
+NOW = datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+FEED = {"name": "Feed", "url": "https://example.com/feed"}
+
+
+def _hours_ago(*hours: float) -> list[datetime]:
+    return [NOW - timedelta(hours=h) for h in hours]
+
+
+def test_first_poll_learns_from_already_seen_entries():
+    scheduler = FeedScheduler([FEED])
+    state = scheduler._states[FEED["url"]]
+
+    # Entries were all ingested before a restart: no fresh articles, timestamps still count
+    scheduler.observe(state, FeedFetch("ok", published=_hours_ago(0, 1, 2, 3), entries=4), NOW)
+
+    assert state.rate_per_hour == 1.0
+    assert state.last_seen_published == NOW
+
+
+def test_errors_do_not_decay_the_rate():
+    scheduler = FeedScheduler([FEED])
+    state = scheduler._states[FEED["url"]]
+    scheduler.observe(state, FeedFetch("ok", published=_hours_ago(0, 1, 2, 3), entries=4), NOW)
+    interval = state.interval_minutes
+
+    later = NOW + timedelta(hours=6)
+    scheduler.observe(state, FeedFetch("error"), later)
+
+    assert state.rate_per_hour == 1.0
+    assert state.interval_minutes == interval
+    assert state.last_polled == NOW
+    assert state.errors == 1
+    assert state.next_due > later
+
+    # A 304 is a real observation of zero new entries
+    scheduler.observe(state, FeedFetch("not_modified"), later)
+    assert state.rate_per_hour < 1.0
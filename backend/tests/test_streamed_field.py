@@ -0,0 +1,51 @@
+"""Incremental decoding of a streamed JSON string field."""
+
+import json
+
+import pytest
+
+from app.services.ai import StreamedField, _decode_partial_string
+
+
+def _stream(text: str, cuts: list[int]) -> tuple[list[str], StreamedField]:
+    field = StreamedField("tweet")
+    deltas = []
+    for end in cuts + [len(text)]:
+        delta = field.feed(text[:end])
+        if delta:
+            deltas.append(delta)
+    return deltas, field
+
+
+def test_partial_string_stops_before_a_split_escape():
+    assert _decode_partial_string('line\\') == ("line", False)
+    assert _decode_partial_string('caf\\u00') == ("caf", False)
+    assert _decode_partial_string('caf\\u00e9" , "x"') == ("café", True)
+
+
+@pytest.mark.parametrize(
+    "tweet",
+    ['Quote "this"\nnext line', "Café \\ tabs\tand emoji 🚀 done", "plain"],
+)
+def test_every_split_point_reassembles_the_field(tweet):
+    text = json.dumps({"tweet": tweet, "hashtags": ["#AI"], "score": 8})
+    for cut in range(len(text)):
+        deltas, field = _stream(text, [cut])
+        assert "".join(deltas) == tweet
+        assert field.complete
+
+
+def test_byte_by_byte_stream_never_emits_escape_fragments():
+    tweet = 'A "quoted" \\ line\nwith é and 🚀'
+    text = json.dumps({"score": 9, "tweet": tweet})
+    deltas, _ = _stream(text, list(range(1, len(text))))
+    assert "".join(deltas) == tweet
+    assert not any("\\" in d and d != "\\" for d in deltas)
+
+
+def test_field_is_ignored_until_its_key_arrives():
+    field = StreamedField("tweet")
+    assert field.feed('{"summary": "not the tweet", "twe') == ""
+    assert field.feed('{"summary": "not the tweet", "tweet": "Hel') == "Hel"
+    assert field.feed('{"summary": "not the tweet", "tweet": "Hello"}') == "lo"
+    assert field.feed('{"summary": "not the tweet", "tweet": "Hello"} more') == ""
@@ -0,0 +1,51 @@
+"""canonicalize_url: variants of one article map to one key."""
+
+import pytest
+
+from app.services.urls import canonicalize_url
+
+CANONICAL = "https://example.com/2024/01/story"
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://example.com/2024/01/story",
+        "http://www.example.com/2024/01/story/",
+        "https://example.com/2024/01/story?utm_source=rss&utm_medium=feed",
+        "https://example.com/2024/01/story?fbclid=abc&ref=twitter#comments",
+        "https://amp.example.com/2024/01/story",
+        "https://example.com/2024/01/story/amp/",
+        "https://example.com/amp/2024/01/story",
+        "https://example-com.cdn.ampproject.org/c/s/example.com/2024/01/story/amp",
+        "https://www.google.com/url?q=https%3A%2F%2Fexample.com%2F2024%2F01%2Fstory%3Futm_source%3Dx",
+        "https://l.facebook.com/l.php?u=https://www.example.com/2024/01/story",
+        "  https://EXAMPLE.com:443/2024/01/story  ",
+    ],
+)
+def test_variants_share_one_key(url):
+    assert canonicalize_url(url) == CANONICAL
+
+
+def test_content_params_are_kept_and_sorted():
+    assert (
+        canonicalize_url("https://example.com/article?page=2&id=7&utm_campaign=x")
+        == "https://example.com/article?id=7&page=2"
+    )
+
+
+def test_distinct_articles_stay_distinct():
+    assert canonicalize_url("https://example.com/a?id=1") != canonicalize_url(
+        "https://example.com/a?id=2"
+    )
+    assert canonicalize_url("https://example.com:8080/a") == "https://example.com:8080/a"
+
+
+def test_amp_html_suffix():
+    assert canonicalize_url("https://example.com/news/story.amp.html") == (
+        "https://example.com/news/story.html"
+    )
+
+
+def test_non_urls_are_returned_stripped():
+    assert canonicalize_url("  not a url ") == "not a url"
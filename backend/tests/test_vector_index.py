@@ -0,0 +1,68 @@
+"""VectorIndex search, time-window masking and eviction."""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.services import vector_index
+from app.services.vector_index import VectorIndex
+
+NOW = datetime.now(timezone.utc)
+
+
+def _unit(i: int, dims: int = 8) -> np.ndarray:
+    return np.eye(1, dims, i, dtype=np.float32)[0]
+
+
+def test_search_ranks_by_cosine_and_applies_threshold():
+    index = VectorIndex(dimensions=8)
+    index.add("a", _unit(0) * 5)  # stored normalized
+    index.add("b", _unit(0) + _unit(1))
+    index.add("c", _unit(2))
+    results = index.search(_unit(0), k=3, threshold=0.5)
+    assert [r[0] for r in results] == ["a", "b"]
+    assert results[0][1] == 1.0
+    assert abs(results[1][1] - 2 ** -0.5) < 1e-6
+
+
+def test_window_masks_older_articles():
+    index = VectorIndex(dimensions=8)
+    index.add("old-exact", _unit(0), NOW - timedelta(hours=48))
+    index.add("recent-close", _unit(0) + 0.5 * _unit(1), NOW - timedelta(hours=1))
+    index.add("naive-recent", _unit(1), (NOW - timedelta(hours=2)).replace(tzinfo=None))
+
+    assert index.search(_unit(0), k=1)[0][0] == "old-exact"
+    windowed = index.search(_unit(0), k=3, window_hours=24)
+    assert [r[0] for r in windowed] == ["recent-close", "naive-recent"]  # old row masked
+    assert [r[0] for r in index.search(_unit(1), k=1, window_hours=24)] == ["naive-recent"]
+
+
+def test_drop_oldest_keeps_the_newest_rows_in_order():
+    index = VectorIndex(dimensions=8, max_items=3)
+    times = [5, 1, 4, 2, 3]  # hours ago
+    for i, hours in enumerate(times):
+        index.add(f"id{i}", _unit(i), NOW - timedelta(hours=hours))
+
+    assert len(index) == 3
+    assert index._ids == ["id1", "id3", "id4"]  # insertion order of the survivors
+    for i in (1, 3, 4):
+        assert index.search(_unit(i), k=1) == [(f"id{i}", 1.0)]
+    assert index.search(_unit(0), k=3, threshold=0.5) == []
+    assert index.search(_unit(2), k=3, threshold=0.5) == []
+
+
+def test_grows_past_initial_capacity(monkeypatch):
+    monkeypatch.setattr(vector_index, "INITIAL_CAPACITY", 2)
+    index = VectorIndex(dimensions=8)
+    for i in range(8):
+        assert index.add(str(i), _unit(i))
+    assert index.stats()["capacity"] == 8
+    assert index.search(_unit(7), k=1) == [("7", 1.0)]
+
+
+def test_unusable_embeddings_are_rejected():
+    index = VectorIndex(dimensions=8)
+    assert not index.add("zero", np.zeros(8))
+    assert not index.add("short", np.ones(4))
+    assert index.search(np.ones(4)) == []
+    assert index.search(_unit(0)) == []
@@ -22,6 +22,7 @@ import {
     XCircle,
     SkipForward,
     Clock,
+    Ban,
 } from "lucide-react";
 import { useArticles } from "@/lib/queries";
 import { ScoreBadge } from "@/components/shared/score-badge";
@@ -35,6 +36,7 @@ const STATUS_OPTIONS: { value: ArticleStatus | "all"; label: string }[] = [
     { value: "rejected", label: "Archived" },
     { value: "deferred", label: "Deferred" },
     { value: "pending", label: "Pending" },
+    { value: "filtered", label: "Filtered" },
 ];
 
 const STATUS_ICON: Record<ArticleStatus, typeof CheckCircle2> = {
@@ -42,6 +44,7 @@ const STATUS_ICON: Record<ArticleStatus, typeof CheckCircle2> = {
     rejected: XCircle,
     deferred: SkipForward,
     pending: Clock,
+    filtered: Ban,
 };
 
 const STATUS_COLOR: Record<ArticleStatus, string> = {
@@ -49,6 +52,7 @@ const STATUS_COLOR: Record<ArticleStatus, string> = {
     rejected: "text-[var(--twax-danger)]",
     deferred: "text-primary",
     pending: "text-muted-foreground",
+    filtered: "text-muted-foreground/60",
 };
 
 export default function HistoryPage() {
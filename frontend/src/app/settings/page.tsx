@@ -37,6 +37,7 @@ export default function SettingsPage() {
         rejected: allArticles?.filter((a) => a.status === "rejected").length ?? 0,
         deferred: allArticles?.filter((a) => a.status === "deferred").length ?? 0,
         pending: allArticles?.filter((a) => a.status === "pending").length ?? 0,
+        filtered: allArticles?.filter((a) => a.status === "filtered").length ?? 0,
     };
 
     return (
@@ -220,7 +221,7 @@ export default function SettingsPage() {
                                         </h2>
                                     </div>
 
-                                    <div className="grid grid-cols-2 md:grid-cols-4 gap-3">
+                                    <div className="grid grid-cols-2 md:grid-cols-5 gap-3">
                                         {[
                                             { label: "Total", value: stats.total, color: "text-foreground" },
                                             {
@@ -238,6 +239,11 @@ export default function SettingsPage() {
                                                 value: stats.pending,
                                                 color: "text-primary",
                                             },
+                                            {
+                                                label: "Filtered",
+                                                value: stats.filtered,
+                                                color: "text-muted-foreground",
+                                            },
                                         ].map((stat) => (
                                             <div
                                                 key={stat.label}
@@ -2,7 +2,7 @@
    TWAX TypeScript types — matches backend Pydantic schemas
    ═══════════════════════════════════════ */
 
-export type ArticleStatus = "pending" | "approved" | "rejected" | "deferred";
+export type ArticleStatus = "pending" | "approved" | "rejected" | "deferred" | "filtered";
 
 export interface Article {
     id: string;
@@ -15,6 +15,8 @@ export interface Article {
     generated_tweet: string | null;
     hashtags: string[];
     status: ArticleStatus;
+    /** Local prefilter verdict score (set for "filtered" articles) */
+    prefilter_score?: number | null;
     created_at: string;
 }
 